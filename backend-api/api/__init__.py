@@ -0,0 +1,64 @@
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+
+def create_app() -> FastAPI:
+    """Build the API: one router per domain, DB/background work started on startup"""
+    from api import activity, admission, coalesce, db, image_blobs, partitions, passwords, profiling, sync, word_snapshot
+    from api.routers import auth, bulk_replace, domain_words, sections, summaries, taxonomy, word_audio
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await db.create_indexes()
+        await sync.create_sync_indexes()
+        await activity.start_activity_log()
+        await word_snapshot.start_word_snapshot()
+        await image_blobs.start_image_collector()
+        yield
+        await image_blobs.stop_image_collector()
+        await word_snapshot.stop_word_snapshot()
+        await activity.stop_activity_log()
+        await passwords.stop_password_hash_pool()
+
+    app = FastAPI(title="Full Summary API", lifespan=lifespan)
+
+    # Middleware added first runs innermost
+    # Sign-in and the profiling/admission endpoints change no content
+    app.add_middleware(
+        coalesce.WriteGenerationMiddleware,
+        skip_paths=admission.AUTH_PATHS,
+        skip_prefixes=admission.UNGATED_PREFIXES
+    )
+    if profiling.profiling_enabled():
+        # Inside admission control, so queue wait isn't profiled
+        app.add_middleware(profiling.ProfilingMiddleware)
+    # Added before CORS so rejected requests still get CORS headers
+    app.add_middleware(admission.AdmissionControlMiddleware)
+    # Also inside CORS, so its 401 and 503 responses are readable by the browser
+    app.middleware("http")(partitions.partition_middleware)
+
+    # ---------------------- CORS Setup ---------------------- #
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # allow all for development
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.middleware("http")(activity.activity_user_middleware)
+
+    # Routes match in registration order; overlapping paths such as
+    # /taxonomy/image/{id} vs /taxonomy/{chapter_id}/{domain_id} rely on it
+    app.include_router(summaries.router)
+    app.include_router(sections.router)
+    app.include_router(word_audio.router)
+    app.include_router(domain_words.router)
+    app.include_router(taxonomy.router)
+    app.include_router(bulk_replace.router)
+    app.include_router(activity.router)
+    app.include_router(admission.router)
+    app.include_router(profiling.router)
+    app.include_router(auth.router)
+    return app
@@ -0,0 +1,178 @@
+from fastapi import APIRouter, HTTPException, Request
+import asyncio
+import contextvars
+import datetime
+
+from api.db import ACTIVITY_LOG, SESSIONS, collection
+from api.sessions import (
+    decode_signed_session_token, is_signed_session_token, peek_cached_session, request_session_token
+)
+
+router = APIRouter(tags=["activity"])
+
+# ====================== ACTIVITY LOG ====================== #
+
+# ---------------------- ACTIVITY LOG SETTINGS ---------------------- #
+# Write handlers call log_activity(), which only appends to an in-process
+# buffer. A background task flushes the buffer with insert_many once it holds
+# ACTIVITY_LOG_BATCH_SIZE events or every ACTIVITY_LOG_FLUSH_INTERVAL seconds,
+# so auditing never adds a DB round trip to an edit request.
+ACTIVITY_LOG_BATCH_SIZE = 100
+ACTIVITY_LOG_FLUSH_INTERVAL = 2.0  # seconds
+ACTIVITY_LOG_MAX_BUFFER = 10000  # drop oldest events beyond this if Mongo is unreachable
+ACTIVITY_LOG_TTL_DAYS = 90
+
+_activity_buffer = []
+_activity_flush_event = asyncio.Event()
+_activity_flush_task = None
+_activity_dropped = 0
+
+# The caller's session token, set by the middleware below without any lookup.
+# The username is taken from it only when an event is logged: signed tokens
+# carry it, database tokens are resolved from the session cache or, failing
+# that, in one batched query when the buffer is flushed.
+current_session_token = contextvars.ContextVar("current_session_token", default=None)
+
+async def activity_user_middleware(request: Request, call_next):
+    current_session_token.set(request_session_token(request))
+    return await call_next(request)
+
+def _event_user(event: dict):
+    """Set the event's user without a lookup, or leave its token for the flush to resolve"""
+    token = current_session_token.get()
+    if not token:
+        event["user"] = "Unknown"
+    elif is_signed_session_token(token):
+        claims = decode_signed_session_token(token)
+        event["user"] = claims["u"] if claims else "Unknown"
+    else:
+        session = peek_cached_session(token)
+        if session:
+            event["user"] = session["username"]
+        else:
+            event["session_token"] = token
+
+async def _resolve_event_users(batch: list):
+    tokens = {event["session_token"] for event in batch if "session_token" in event}
+    if not tokens:
+        return
+    usernames = {}
+    # Expired sessions still name who acted while they were valid
+    async for session in collection(SESSIONS).find({"session_token": {"$in": list(tokens)}}, {"session_token": 1, "username": 1}):
+        usernames[session["session_token"]] = session["username"]
+    for event in batch:
+        if "session_token" in event:
+            event["user"] = usernames.get(event.pop("session_token"), "Unknown")
+
+def log_activity(action: str, tool: str, details: str, chapter_id: str = None, entity_id: str = None):
+    """Queue an audit event; never touches the database"""
+    global _activity_dropped
+    event = {
+        "timestamp": datetime.datetime.utcnow(),
+        "action": action,
+        "tool": tool,
+        "details": details,
+        "chapter_id": chapter_id,
+        "entity_id": entity_id
+    }
+    _event_user(event)
+    _activity_buffer.append(event)
+    if len(_activity_buffer) > ACTIVITY_LOG_MAX_BUFFER:
+        overflow = len(_activity_buffer) - ACTIVITY_LOG_MAX_BUFFER
+        del _activity_buffer[:overflow]
+        _activity_dropped += overflow
+    if len(_activity_buffer) >= ACTIVITY_LOG_BATCH_SIZE:
+        _activity_flush_event.set()
+
+async def flush_activity_log():
+    global _activity_buffer
+    if not _activity_buffer:
+        return
+    batch, _activity_buffer = _activity_buffer, []
+    try:
+        await _resolve_event_users(batch)
+        await collection(ACTIVITY_LOG).insert_many(batch, ordered=False)
+    except Exception as e:
+        print(f"❌ Failed to flush {len(batch)} activity events: {str(e)}")
+        # Put the batch back in front so it is retried on the next flush
+        _activity_buffer = batch + _activity_buffer
+
+async def _activity_flush_loop():
+    while True:
+        try:
+            await asyncio.wait_for(_activity_flush_event.wait(), timeout=ACTIVITY_LOG_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _activity_flush_event.clear()
+        await flush_activity_log()
+
+async def start_activity_log():
+    global _activity_flush_task
+    await collection(ACTIVITY_LOG).create_index(
+        "timestamp", expireAfterSeconds=ACTIVITY_LOG_TTL_DAYS * 24 * 3600
+    )
+    await collection(ACTIVITY_LOG).create_index([("user", 1), ("timestamp", -1)])
+    await collection(ACTIVITY_LOG).create_index([("tool", 1), ("timestamp", -1)])
+    await collection(ACTIVITY_LOG).create_index([("chapter_id", 1), ("timestamp", -1)])
+    _activity_flush_task = asyncio.create_task(_activity_flush_loop())
+
+async def stop_activity_log():
+    if _activity_flush_task:
+        _activity_flush_task.cancel()
+    await flush_activity_log()
+
+# ---------------------- GET ACTIVITY LOG ---------------------- #
+@router.get("/activity")
+async def get_activity(
+    page: int = 1,
+    page_size: int = 50,
+    user: str = None,
+    tool: str = None,
+    action: str = None,
+    chapter_id: str = None,
+    since: datetime.datetime = None,
+    until: datetime.datetime = None
+):
+    if page < 1 or not 1 <= page_size <= 500:
+        raise HTTPException(status_code=400, detail="page must be >= 1 and page_size between 1 and 500")
+
+    query = {}
+    if user:
+        query["user"] = user
+    if tool:
+        query["tool"] = tool
+    if action:
+        query["action"] = action
+    if chapter_id:
+        query["chapter_id"] = chapter_id
+    if since or until:
+        query["timestamp"] = {}
+        if since:
+            query["timestamp"]["$gte"] = since
+        if until:
+            query["timestamp"]["$lt"] = until
+
+    try:
+        activities = []
+        # Fetch one extra row to know whether another page exists without a count query
+        cursor = collection(ACTIVITY_LOG).find(query).sort("timestamp", -1) \
+            .skip((page - 1) * page_size).limit(page_size + 1)
+        async for doc in cursor:
+            activities.append({
+                "_id": str(doc["_id"]),
+                "timestamp": doc["timestamp"].isoformat(),
+                "action": doc.get("action", ""),
+                "tool": doc.get("tool", ""),
+                "details": doc.get("details", ""),
+                "chapter_id": doc.get("chapter_id"),
+                "entity_id": doc.get("entity_id"),
+                "user": doc.get("user", "Unknown")
+            })
+        return {
+            "activities": activities[:page_size],
+            "page": page,
+            "page_size": page_size,
+            "has_more": len(activities) > page_size
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching activity log: {str(e)}")
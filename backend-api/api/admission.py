@@ -0,0 +1,164 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+import asyncio
+import math
+import os
+import time
+
+from api import coalesce
+
+router = APIRouter(tags=["admission"])
+
+# ====================== ADMISSION CONTROL ====================== #
+# Every request is put in a route class with its own concurrency limit and a
+# bounded wait queue, so a storm of /all-* dumps or image transfers can't make
+# cheap point reads and session checks queue up behind them. When a class is
+# saturated the request fails fast: 429 if its queue is already full, 503 if
+# it waited longer than the class allows. Both carry Retry-After.
+#
+# Limits are (max concurrent, max queued, max queue wait in seconds) and can be
+# overridden with ADMISSION_<CLASS>_CONCURRENCY / _QUEUE / _WAIT.
+ROUTE_CLASS_DEFAULTS = {
+    "listing": (4, 16, 2.0),
+    "image": (8, 32, 2.0),
+    "auth": (16, 64, 1.0),
+    "point": (64, 256, 0.5),
+}
+
+AUTH_PATHS = {"/signup", "/login", "/verify-session", "/logout", "/forgot-password", "/reset-password"}
+IMAGE_PREFIXES = ("/taxonomy/image", "/taxonomy-with-image", "/domain-words/audio")  # binary transfers
+LISTING_PREFIXES = ("/all-", "/translations/", "/domain-words/search")
+BATCH_READ_PATHS = coalesce.READ_ONLY_POST_PATHS  # POST, but read-only
+UNGATED_PREFIXES = ("/docs", "/redoc", "/openapi.json", "/admission", "/profiling")
+
+# Queue wait histogram bucket upper bounds, in seconds
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1.0, math.inf)
+
+def classify_request(method: str, path: str):
+    """Route class for a request, or None when it isn't gated (writes, docs)"""
+    if path.startswith(UNGATED_PREFIXES):
+        return None
+    if path in AUTH_PATHS:
+        return "auth"
+    if path.startswith(IMAGE_PREFIXES):
+        return "image"
+    if path in BATCH_READ_PATHS:
+        return "point"
+    if method != "GET":
+        return None
+    if path.startswith(LISTING_PREFIXES):
+        return "listing"
+    return "point"
+
+class AdmissionGate:
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_histogram = [0] * len(WAIT_BUCKETS)
+
+    async def acquire(self):
+        """Take a slot; returns None when admitted, else the HTTP status to reject with"""
+        start = time.perf_counter()
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self.rejected_queue_full += 1
+                return 429
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                return 503
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        waited = time.perf_counter() - start
+        self.admitted += 1
+        self.in_flight += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.wait_histogram[next(i for i, bound in enumerate(WAIT_BUCKETS) if waited <= bound)] += 1
+        return None
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def metrics(self):
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "queue_wait_avg_ms": round(self.wait_total / self.admitted * 1000, 3) if self.admitted else 0.0,
+            "queue_wait_max_ms": round(self.wait_max * 1000, 3),
+            "queue_wait_histogram": {
+                ("+Inf" if bound == math.inf else f"<={bound * 1000:g}ms"): count
+                for bound, count in zip(WAIT_BUCKETS, self.wait_histogram)
+            }
+        }
+
+def _limit(route_class: str, setting: str, default):
+    value = os.environ.get(f"ADMISSION_{route_class.upper()}_{setting}")
+    return type(default)(value) if value else default
+
+gates = {
+    route_class: AdmissionGate(
+        route_class,
+        _limit(route_class, "CONCURRENCY", concurrency),
+        _limit(route_class, "QUEUE", queue),
+        _limit(route_class, "WAIT", wait)
+    )
+    for route_class, (concurrency, queue, wait) in ROUTE_CLASS_DEFAULTS.items()
+}
+
+class AdmissionControlMiddleware:
+    """Plain ASGI middleware so the slot is held until the response body is fully sent"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        route_class = classify_request(scope["method"], scope["path"])
+        if route_class is None:
+            return await self.app(scope, receive, send)
+
+        gate = gates[route_class]
+        rejected_status = await gate.acquire()
+        if rejected_status:
+            response = JSONResponse(
+                status_code=rejected_status,
+                content={"detail": f"Server busy ({route_class} requests), please retry shortly"},
+                headers={"Retry-After": str(max(1, math.ceil(gate.max_wait)))}
+            )
+            return await response(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
+
+# ---------------------- ADMISSION METRICS ---------------------- #
+@router.get("/admission/metrics")
+async def get_admission_metrics():
+    return {
+        **{route_class: gate.metrics() for route_class, gate in gates.items()},
+        "coalesced_reads": coalesce.coalesced_hits
+    }
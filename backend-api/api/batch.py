@@ -0,0 +1,29 @@
+from fastapi import HTTPException
+from pydantic import BaseModel
+import os
+
+# ---------------------- BATCH MULTI-GET ---------------------- #
+# Resolves a list of (chapter_id, domain_id) keys with a single $or query; each
+# clause is an equality match on the unique (chapter_id, domain_id) index.
+BATCH_GET_MAX_KEYS = int(os.environ.get("BATCH_GET_MAX_KEYS", 500))
+
+class BatchKey(BaseModel):
+    chapter_id: str
+    domain_id: str
+
+class BatchGetRequest(BaseModel):
+    keys: list[BatchKey]
+
+async def batch_get(collection, keys: list[BatchKey], projection: dict):
+    """Return one document (or None for a miss) per key, in request order"""
+    if not keys:
+        raise HTTPException(status_code=400, detail="keys must not be empty")
+    if len(keys) > BATCH_GET_MAX_KEYS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_GET_MAX_KEYS} keys per batch")
+
+    unique_keys = list(dict.fromkeys((key.chapter_id, key.domain_id) for key in keys))
+    query = {"$or": [{"chapter_id": chapter_id, "domain_id": domain_id} for chapter_id, domain_id in unique_keys]}
+    found = {}
+    async for doc in collection.find(query, {**projection, "chapter_id": 1, "domain_id": 1}):
+        found[(doc["chapter_id"], doc["domain_id"])] = doc
+    return [found.get((key.chapter_id, key.domain_id)) for key in keys]
@@ -0,0 +1,61 @@
+import asyncio
+
+from api.db import partition_slug
+
+# ---------------------- REQUEST COALESCING ---------------------- #
+# Identical concurrent reads (same partition, route and parameters) share one in-flight
+# computation: the first request runs the DB query and encodes the response,
+# later ones await the same task. Nothing is cached once it finishes.
+#
+# Any content write bumps the write generation before its response is sent, so
+# a read that arrives after a write never joins a flight that started before it.
+_write_generation = 0
+_in_flight = {}
+coalesced_hits = 0
+
+# POST routes that only read, so they don't end a coalescing window
+READ_ONLY_POST_PATHS = {"/domain-words/batch-get", "/taxonomy/batch-get"}
+# Routes that call note_write() themselves, only when they actually write
+EXPLICIT_WRITE_PATHS = {"/bulk-replace"}
+
+def note_write():
+    global _write_generation
+    _write_generation += 1
+
+async def single_flight(key: tuple, compute):
+    """Run compute() once per key and generation; concurrent callers share the result"""
+    global coalesced_hits
+    flight_key = (partition_slug(), key, _write_generation)
+    task = _in_flight.get(flight_key)
+    if task is None:
+        # A task, so a disconnecting first caller doesn't cancel it for the others
+        task = asyncio.ensure_future(compute())
+        _in_flight[flight_key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(flight_key, None))
+    else:
+        coalesced_hits += 1
+    return await asyncio.shield(task)
+
+class WriteGenerationMiddleware:
+    """Plain ASGI middleware bumping the write generation for every content write request;
+    `skip_paths` and `skip_prefixes` name the non-GET routes that don't change content"""
+
+    def __init__(self, app, skip_paths=frozenset(), skip_prefixes=()):
+        self.app = app
+        self.skip_paths = READ_ONLY_POST_PATHS | EXPLICIT_WRITE_PATHS | set(skip_paths)
+        self.skip_prefixes = tuple(skip_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS") \
+                or scope["path"] in self.skip_paths or scope["path"].startswith(self.skip_prefixes):
+            return await self.app(scope, receive, send)
+
+        async def send_after_write(message):
+            if message["type"] == "http.response.start":
+                note_write()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_after_write)
+        finally:
+            note_write()
@@ -0,0 +1,59 @@
+from fastapi import Header, HTTPException
+from pymongo.errors import DuplicateKeyError
+
+# ---------------------- OPTIMISTIC CONCURRENCY ---------------------- #
+# Every editable document carries an integer `version` (missing == 0) that is
+# bumped atomically by each write. Clients send the version they last read via
+# If-Match or ?expected_version=; a mismatch returns 409 instead of silently
+# overwriting someone else's edit.
+NEXT_VERSION = {"$add": [{"$ifNull": ["$version", 0]}, 1]}  # for pipeline updates
+
+def get_expected_version(expected_version: int | None = None, if_match: str | None = Header(None)):
+    if if_match and if_match.strip() != "*":
+        value = if_match.strip()
+        if value.startswith("W/"):
+            value = value[2:]
+        try:
+            return int(value.strip('"'))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="If-Match must be a document version number")
+    return expected_version
+
+def version_filter(expected_version: int | None):
+    if expected_version is None:
+        return {}
+    if expected_version == 0:
+        # Documents written before versioning have no version field
+        return {"version": {"$in": [0, None]}}
+    return {"version": expected_version}
+
+async def diagnose_failed_update(collection, key: dict, expected_version: int | None, not_found_detail: str):
+    """Explain why a conditional update matched nothing: 404, 409, or return the current doc"""
+    doc = await collection.find_one(key)
+    if not doc:
+        raise HTTPException(status_code=404, detail=not_found_detail)
+    current_version = doc.get("version", 0)
+    if expected_version is not None and current_version != expected_version:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Version conflict: expected version {expected_version}, current version is {current_version}"
+        )
+    return doc
+
+async def upsert_document(collection, key: dict, update: dict, **kwargs):
+    """find_one_and_update(upsert=True), retrying once if a concurrent upsert inserted the same key first"""
+    for attempt in range(2):
+        try:
+            return await collection.find_one_and_update(key, update, upsert=True, **kwargs)
+        except DuplicateKeyError:
+            if attempt:
+                raise HTTPException(status_code=409, detail="Document was created concurrently, please retry")
+
+def splice_sentences(index: int, replacement: list):
+    """Pipeline expression rebuilding full_summary with the sentence at `index` replaced"""
+    parts = []
+    if index > 0:
+        parts.append({"$slice": ["$full_summary", index]})
+    parts.append(replacement)
+    parts.append({"$slice": ["$full_summary", index + 1, {"$max": [{"$size": "$full_summary"}, 1]}]})
+    return {"$concatArrays": parts}
@@ -0,0 +1,121 @@
+import contextvars
+import os
+import re
+
+# ---------------------- MongoDB Setup ---------------------- #
+# The Motor client is created on first use rather than at import time, so
+# importing the app (workers, tooling, --profile-startup) never touches Mongo.
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017/")
+MONGO_DB = os.environ.get("MONGO_DB", "test")
+
+FULL_SUMMARY = "data"
+SECTION_SUMMARY = "section_summary"
+DOMAIN_WORDS = "domain_words"
+TAXONOMY = "taxonomy"
+SUMMARY_REVISIONS = "summary_revisions"
+ACTIVITY_LOG = "activity_log"
+USERS = "users"
+SESSIONS = "sessions"
+PASSWORD_RESETS = "password_resets"
+TOMBSTONES = "tombstones"
+WORD_AUDIO_BUCKET = "word_audio"  # GridFS bucket, kept out of domain word documents
+SUMMARY_SENTENCES = "summary_sentences"  # one document per sentence of chapters in sentence storage
+TAXONOMY_IMAGES = "taxonomy_images"  # image bytes keyed by SHA-256, shared by taxonomy documents
+COUNTERS = "counters"  # small named counters, e.g. the domain word write generation
+
+# ---------------------- Domain Partitions ---------------------- #
+# DATA_PARTITIONING=database keeps each user domain's content in its own
+# database (<MONGO_DB>_<domain>); =collection keeps it in prefixed collections
+# (<domain>__<name>) of MONGO_DB. The domain comes from the caller's session
+# (see api.partitions); content requests without one are refused, and
+# sessions of users without a domain use the shared collections.
+# Users, sessions and the activity log are always shared. A domain can be moved
+# to another server with DOMAIN_MONGO_URLS="medical=mongodb://host2:27017/,...".
+DATA_PARTITIONING = os.environ.get("DATA_PARTITIONING", "off")  # off | database | collection
+PARTITIONED_COLLECTIONS = {
+    FULL_SUMMARY, SECTION_SUMMARY, DOMAIN_WORDS, TAXONOMY, SUMMARY_REVISIONS, TOMBSTONES,
+    SUMMARY_SENTENCES, TAXONOMY_IMAGES, COUNTERS
+}
+
+current_domain = contextvars.ContextVar("current_domain", default=None)
+
+def _slugify(domain: str):
+    return re.sub(r"[^a-z0-9_]+", "_", domain.strip().lower()).strip("_")[:40]
+
+DOMAIN_MONGO_URLS = {
+    _slugify(domain): url.strip()
+    for domain, _, url in (entry.partition("=") for entry in os.environ.get("DOMAIN_MONGO_URLS", "").split(","))
+    if url
+}
+
+def partition_slug(domain: str | None = None):
+    """Name-safe form of the request's domain, or None when content is shared"""
+    domain = domain if domain is not None else current_domain.get()
+    if DATA_PARTITIONING == "off" or not domain:
+        return None
+    return _slugify(domain) or None
+
+_clients = {}
+
+def get_client(url: str = MONGO_URL):
+    if url not in _clients:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        _clients[url] = AsyncIOMotorClient(url)
+    return _clients[url]
+
+def get_db():
+    return get_client()[MONGO_DB]
+
+def _partition_location(name: str):
+    """(database, collection name) holding `name` for the current request"""
+    slug = partition_slug()
+    if slug is None:
+        return get_db(), name
+    client = get_client(DOMAIN_MONGO_URLS.get(slug, MONGO_URL))
+    if DATA_PARTITIONING == "database":
+        return client[f"{MONGO_DB}_{slug}"], name
+    return client[MONGO_DB], f"{slug}__{name}"
+
+def collection(name: str):
+    if name not in PARTITIONED_COLLECTIONS:
+        return get_db()[name]
+    database, collection_name = _partition_location(name)
+    return database[collection_name]
+
+def gridfs_bucket(name: str):
+    from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+    database, bucket_name = _partition_location(name)
+    return AsyncIOMotorGridFSBucket(database, bucket_name=bucket_name)
+
+# ---------------------- Startup: Indexes ---------------------- #
+# Unique keys let create endpoints insert directly and rely on DuplicateKeyError
+# instead of checking for an existing document first
+UNIQUE_KEYS = [
+    (FULL_SUMMARY, [("chapter_id", 1)]),
+    (SECTION_SUMMARY, [("chapter_id", 1), ("section_id", 1)]),
+    (DOMAIN_WORDS, [("chapter_id", 1), ("domain_id", 1)]),
+    (TAXONOMY, [("chapter_id", 1), ("domain_id", 1)]),
+]
+
+async def create_indexes():
+    await collection(SUMMARY_REVISIONS).create_index(
+        [("kind", 1), ("chapter_id", 1), ("section_id", 1), ("revision", 1)],
+        unique=True
+    )
+    # Not unique: deleting a sentence shifts later positions down one by one
+    await collection(SUMMARY_SENTENCES).create_index([("chapter_id", 1), ("position", 1)])
+    # The image collector looks for blobs nothing references any more
+    await collection(TAXONOMY_IMAGES).create_index([("refcount", 1), ("released_at", 1)])
+    # Lets /translations/{lang} find words having a given language without a collection scan
+    await collection(DOMAIN_WORDS).create_index([("translations.$**", 1)])
+    failed = []
+    for name, keys in UNIQUE_KEYS:
+        try:
+            await collection(name).create_index(keys, unique=True)
+        except Exception as e:
+            print(f"❌ Could not create unique index on {name} {keys}: {str(e)}")
+            failed.append(name)
+    if failed:
+        # Create endpoints rely on these indexes to reject duplicates, so don't
+        # serve without them; usually existing duplicate documents must be merged first
+        raise RuntimeError(f"Unique indexes missing on {failed}, remove duplicate documents and restart")
@@ -0,0 +1,128 @@
+from bson import Binary
+from datetime import timedelta
+import asyncio
+import hashlib
+import os
+
+from api.concurrency import upsert_document
+from api.db import TAXONOMY, TAXONOMY_IMAGES, collection, current_domain
+from api.sync import utc_now
+
+# ====================== CONTENT-ADDRESSED TAXONOMY IMAGES ====================== #
+# Many taxonomy entries share the same diagram, so image bytes are stored once
+# per distinct content in TAXONOMY_IMAGES, keyed by their SHA-256, with a count
+# of the taxonomy documents pointing at them (`image_hash`).
+#
+# Writers acquire the new blob before pointing a document at it and release
+# the old one after, so a crash can only leave a count too high (the blob is
+# kept), never too low. The collector deletes blobs whose count has been zero
+# for IMAGE_BLOB_GC_GRACE_SECONDS, and moves legacy inline `taxonomy_image`
+# bytes into blobs, a batch per pass, without touching version or updated_at.
+IMAGE_BLOB_GC_INTERVAL = float(os.environ.get("IMAGE_BLOB_GC_INTERVAL", 600))  # seconds between collector passes
+IMAGE_BLOB_GC_GRACE_SECONDS = float(os.environ.get("IMAGE_BLOB_GC_GRACE_SECONDS", 300))
+IMAGE_BLOB_MIGRATION_BATCH = int(os.environ.get("IMAGE_BLOB_MIGRATION_BATCH", 200))
+
+_pending_domains = {None}  # partitions the collector should visit on its next pass
+_collector_task = None
+
+def image_hash(data: bytes):
+    return hashlib.sha256(data).hexdigest()
+
+# ---------------------- REFERENCE COUNTING ---------------------- #
+async def acquire_image(data: bytes | None):
+    """Store `data` (once per distinct content) and take a reference; returns its hash"""
+    if not data:
+        return None
+    digest = image_hash(data)
+    await upsert_document(
+        collection(TAXONOMY_IMAGES),
+        {"_id": digest},
+        {
+            "$setOnInsert": {"data": Binary(data), "length": len(data), "created_at": utc_now()},
+            "$inc": {"refcount": 1}
+        },
+        projection={"_id": 1}
+    )
+    return digest
+
+async def release_image(digest: str | None):
+    if not digest:
+        return
+    try:
+        await collection(TAXONOMY_IMAGES).update_one(
+            {"_id": digest},
+            {"$inc": {"refcount": -1}, "$set": {"released_at": utc_now()}}
+        )
+    except Exception as e:
+        # The blob is only kept longer than needed
+        print(f"❌ Could not release taxonomy image {digest}: {str(e)}")
+    _pending_domains.add(current_domain.get())
+
+async def load_image(doc: dict):
+    """Image bytes of a taxonomy document: its blob, or legacy inline bytes"""
+    digest = doc.get("image_hash")
+    if not digest:
+        if doc.get("taxonomy_image"):
+            _pending_domains.add(current_domain.get())
+        return doc.get("taxonomy_image")
+    blob = await collection(TAXONOMY_IMAGES).find_one({"_id": digest}, {"data": 1})
+    return bytes(blob["data"]) if blob else None
+
+# ---------------------- COLLECTOR ---------------------- #
+async def _migrate_inline_images():
+    """Move a batch of legacy inline images into blobs; returns how many moved"""
+    moved = 0
+    cursor = collection(TAXONOMY).find(
+        {"taxonomy_image": {"$type": "binData"}},
+        {"taxonomy_image": 1, "version": 1}
+    ).limit(IMAGE_BLOB_MIGRATION_BATCH)
+    async for doc in cursor:
+        digest = await acquire_image(bytes(doc["taxonomy_image"]))
+        # Only if the document wasn't edited meanwhile; same content, so no version bump
+        result = await collection(TAXONOMY).update_one(
+            {"_id": doc["_id"], "version": doc.get("version"), "image_hash": {"$exists": False}},
+            {"$set": {"image_hash": digest}, "$unset": {"taxonomy_image": ""}}
+        )
+        if result.modified_count:
+            moved += 1
+        else:
+            await release_image(digest)
+    return moved
+
+async def collect_images():
+    """One pass over the current partition; True if it should be visited again"""
+    moved = await _migrate_inline_images()
+    result = await collection(TAXONOMY_IMAGES).delete_many({
+        "refcount": {"$lte": 0},
+        "released_at": {"$lt": utc_now() - timedelta(seconds=IMAGE_BLOB_GC_GRACE_SECONDS)}
+    })
+    if moved or result.deleted_count:
+        print(f"✅ Taxonomy images: {moved} moved to blobs, {result.deleted_count} unreferenced blobs removed")
+    # Revisit while inline images or blobs still in their grace period remain
+    return moved == IMAGE_BLOB_MIGRATION_BATCH or bool(
+        await collection(TAXONOMY_IMAGES).count_documents({"refcount": {"$lte": 0}}, limit=1)
+    )
+
+async def _image_collector_loop():
+    while True:
+        domains = list(_pending_domains)
+        _pending_domains.clear()
+        for domain in domains:
+            token = current_domain.set(domain)
+            try:
+                if await collect_images():
+                    _pending_domains.add(domain)
+            except Exception as e:
+                _pending_domains.add(domain)
+                print(f"❌ Taxonomy image collection failed: {str(e)}")
+            finally:
+                current_domain.reset(token)
+        await asyncio.sleep(IMAGE_BLOB_GC_INTERVAL)
+
+async def start_image_collector():
+    global _collector_task
+    _collector_task = asyncio.create_task(_image_collector_loop())
+
+async def stop_image_collector():
+    if _collector_task:
+        _collector_task.cancel()
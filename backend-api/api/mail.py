@@ -0,0 +1,82 @@
+# ====================== EMAIL CONFIGURATION ====================== #
+# smtplib and email.mime are imported inside send_password_reset_email: they
+# are only needed for the rare forgot-password flow, not at worker startup.
+
+# Update with your actual email credentials
+SMTP_CONFIG = {
+    "server": "smtp.gmail.com",
+    "port": 587,
+    "email": "varunclg5@gmail.com",    # Replace with your Gmail
+    "password": "hfsw fvfd wvyz rbck"     # Replace with Gmail App Password
+}
+
+async def send_password_reset_email(email: str, reset_token: str):
+    """Send password reset email with reset link"""
+    try:
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+        
+        # Create reset link - points to your React frontend
+        reset_link = f"http://localhost:5173/reset-password/{reset_token}"
+        
+        # Email content
+        subject = "Password Reset Request"
+        body = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <style>
+                body {{ font-family: Arial, sans-serif; color: #333; }}
+                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+                .button {{ background-color: #3b82f6; color: white; padding: 12px 24px; 
+                         text-decoration: none; border-radius: 6px; display: inline-block; }}
+                .footer {{ color: #6b7280; font-size: 14px; margin-top: 20px; }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <h2>Password Reset Request</h2>
+                <p>Hello,</p>
+                <p>You requested to reset your password. Click the button below to create a new password:</p>
+                
+                <p style="text-align: center; margin: 30px 0;">
+                    <a href="{reset_link}" class="button">Reset Your Password</a>
+                </p>
+                
+                <p>Or copy and paste this link in your browser:</p>
+                <p style="word-break: break-all; color: #6b7280; background: #f8fafc; padding: 10px; border-radius: 4px;">
+                    {reset_link}
+                </p>
+                
+                <p>This link will expire in 1 hour.</p>
+                <p>If you didn't request this reset, please ignore this email.</p>
+                
+                <div class="footer">
+                    <p>Best regards,<br>Your App Team</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+        
+        # Create message
+        msg = MIMEMultipart()
+        msg['From'] = SMTP_CONFIG["email"]
+        msg['To'] = email
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'html'))
+        
+        # Send email
+        server = smtplib.SMTP(SMTP_CONFIG["server"], SMTP_CONFIG["port"])
+        server.starttls()
+        server.login(SMTP_CONFIG["email"], SMTP_CONFIG["password"])
+        server.send_message(msg)
+        server.quit()
+        
+        print(f"✅ Password reset email sent to {email}")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Failed to send email to {email}: {str(e)}")
+        return False
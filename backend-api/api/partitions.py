@@ -0,0 +1,54 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+import asyncio
+
+from api import admission, db, sync
+from api.sessions import cached_session, request_session_token
+
+# ---------------------- DOMAIN PARTITION ROUTING ---------------------- #
+# With DATA_PARTITIONING enabled, each request is routed to its user's domain
+# partition (see api.db). The session token is read from
+# `Authorization: Bearer <token>` or X-Session-Token and resolved through the
+# shared session cache (api.sessions.cached_session), so content requests don't
+# pay a session lookup each. Content requests without a valid session get a 401
+# rather than the shared collections; sessions of users without a domain still
+# use them. The first request for a domain in a process creates that
+# partition's indexes; if that fails, the next request tries again.
+UNPARTITIONED_PATHS = {"/activity"}  # shared collections only
+
+_prepared_partitions = {}  # slug -> index creation task
+
+def _needs_partition(request: Request):
+    path = request.url.path
+    return request.method != "OPTIONS" and path not in admission.AUTH_PATHS \
+        and path not in UNPARTITIONED_PATHS and not path.startswith(admission.UNGATED_PREFIXES)
+
+async def _prepare_partition():
+    await db.create_indexes()
+    await sync.create_sync_indexes()
+
+def _forget_failed(slug: str, task: asyncio.Future):
+    if task.cancelled() or task.exception():
+        if not task.cancelled():
+            print(f"❌ Could not create indexes for domain partition {slug}: {str(task.exception())}")
+        if _prepared_partitions.get(slug) is task:
+            del _prepared_partitions[slug]
+
+async def partition_middleware(request: Request, call_next):
+    if db.DATA_PARTITIONING != "off" and _needs_partition(request):
+        token = request_session_token(request)
+        session = await cached_session(token) if token else None
+        if not session:
+            return JSONResponse(status_code=401, content={"detail": "A valid session is required"})
+        if session["domain"]:
+            db.current_domain.set(session["domain"])
+            slug = db.partition_slug()
+            task = _prepared_partitions.get(slug)
+            if task is None:
+                task = _prepared_partitions[slug] = asyncio.ensure_future(_prepare_partition())
+                task.add_done_callback(lambda done: _forget_failed(slug, done))
+            try:
+                await asyncio.shield(task)
+            except Exception:
+                return JSONResponse(status_code=503, content={"detail": "Domain data is not available yet, please retry shortly"})
+    return await call_next(request)
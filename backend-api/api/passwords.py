@@ -0,0 +1,71 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+# ====================== PASSWORD HASHING ====================== #
+# Passwords are hashed with scrypt (memory-hard) in a bounded thread pool so a
+# burst of logins can't stall the event loop; hashlib.scrypt releases the GIL.
+# Stored format: scrypt$<n>$<r>$<p>$<salt b64>$<hash b64>. Legacy unsalted
+# SHA-256 hex digests are still accepted and upgraded on the next good login.
+PASSWORD_SCRYPT_N = int(os.environ.get("PASSWORD_SCRYPT_N", 2 ** 14))
+PASSWORD_SCRYPT_R = int(os.environ.get("PASSWORD_SCRYPT_R", 8))
+PASSWORD_SCRYPT_P = int(os.environ.get("PASSWORD_SCRYPT_P", 1))
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+
+_password_hash_pool = None
+
+def _get_password_hash_pool():
+    # Created on first login/signup so workers don't spawn threads at import time
+    global _password_hash_pool
+    if _password_hash_pool is None:
+        _password_hash_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+    return _password_hash_pool
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=128 * n * r * p + 1024 * 1024, dklen=32
+    )
+
+def _hash_password_sync(password: str) -> str:
+    salt = secrets.token_bytes(16)
+    digest = _scrypt(password, salt, PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+    return "$".join([
+        "scrypt", str(PASSWORD_SCRYPT_N), str(PASSWORD_SCRYPT_R), str(PASSWORD_SCRYPT_P),
+        base64.b64encode(salt).decode(), base64.b64encode(digest).decode()
+    ])
+
+def _verify_password_sync(password: str, stored_hash: str) -> bool:
+    if not stored_hash:
+        return False
+    if not stored_hash.startswith("scrypt$"):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, stored_hash)
+    try:
+        _, n, r, p, salt, digest = stored_hash.split("$")
+        expected = base64.b64decode(digest)
+        actual = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    except ValueError:
+        return False
+    return hmac.compare_digest(actual, expected)
+
+def password_needs_rehash(stored_hash: str) -> bool:
+    """True for legacy SHA-256 hashes and scrypt hashes made with other cost settings"""
+    current = f"scrypt${PASSWORD_SCRYPT_N}${PASSWORD_SCRYPT_R}${PASSWORD_SCRYPT_P}$"
+    return not stored_hash.startswith(current)
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_password_hash_pool(), _hash_password_sync, password)
+
+async def verify_password(password: str, stored_hash: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_password_hash_pool(), _verify_password_sync, password, stored_hash)
+
+async def stop_password_hash_pool():
+    if _password_hash_pool is not None:
+        _password_hash_pool.shutdown(wait=False)
@@ -0,0 +1,245 @@
+from collections import Counter, deque
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+router = APIRouter(tags=["profiling"])
+
+# ====================== ON-DEMAND PROFILING ====================== #
+# Off unless PROFILING_ADMIN_TOKEN is set: then the middleware is installed and
+# the /profiling endpoints accept requests carrying that token in X-Admin-Token.
+#
+# CPU: a request is profiled when it sends `X-Profile: 1` with the admin token,
+# or when its path matches a configured sample rate (PROFILE_SAMPLE_RATES, e.g.
+# "/all-domain-words=0.05,/taxonomy/image=0.01", or PUT /profiling/sample-rates).
+# A background thread samples the event loop thread's stack every
+# PROFILE_INTERVAL seconds while a profiled request is in flight, so samples also
+# include other requests the loop ran meanwhile. Profiles are kept in memory
+# (last PROFILE_KEEP) and exported as folded stacks, the input format of
+# flamegraph.pl, speedscope and inferno.
+#
+# Memory: tracemalloc can be started, snapshotted and diffed through the API.
+# Snapshot tracebacks export as folded stacks weighted by bytes.
+PROFILING_ADMIN_TOKEN = os.environ.get("PROFILING_ADMIN_TOKEN")
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", 0.005))  # seconds between stack samples
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 50))
+TRACEMALLOC_FRAMES = int(os.environ.get("TRACEMALLOC_FRAMES", 25))
+
+def _parse_sample_rates(value: str):
+    rates = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        prefix, _, rate = entry.partition("=")
+        rates[prefix] = float(rate)
+    return rates
+
+sample_rates = _parse_sample_rates(os.environ.get("PROFILE_SAMPLE_RATES", ""))
+_profiles = deque(maxlen=PROFILE_KEEP)
+_profile_ids = itertools.count(1)
+_memory_snapshots = {}
+_memory_snapshot_ids = itertools.count(1)
+
+def profiling_enabled():
+    return bool(PROFILING_ADMIN_TOKEN)
+
+def _is_admin(token: str | None):
+    return bool(token) and profiling_enabled() and hmac.compare_digest(token, PROFILING_ADMIN_TOKEN)
+
+def require_profiling_admin(x_admin_token: str | None = Header(None)):
+    if not profiling_enabled():
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not _is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+# ---------------------- STACK SAMPLER ---------------------- #
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class StackSampler:
+    """Samples registered threads' stacks into folded-stack counters while any are registered"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, thread_id: int):
+        counter = Counter()
+        with self._lock:
+            self._targets[id(counter)] = (thread_id, counter)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+                self._thread.start()
+        return counter
+
+    def stop(self, counter: Counter):
+        with self._lock:
+            self._targets.pop(id(counter), None)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._targets:
+                    self._thread = None
+                    return
+                targets = list(self._targets.values())
+            frames = sys._current_frames()
+            for thread_id, counter in targets:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if stack:
+                    counter[";".join(reversed(stack))] += 1
+            del frames
+            time.sleep(self.interval)
+
+sampler = StackSampler(PROFILE_INTERVAL)
+
+def folded(counter: Counter):
+    return "\n".join(f"{stack} {count}" for stack, count in counter.most_common()) + "\n"
+
+# ---------------------- PROFILING MIDDLEWARE ---------------------- #
+def _should_profile(scope):
+    for name, value in scope["headers"]:
+        if name == b"x-profile" and value == b"1":
+            token = dict(scope["headers"]).get(b"x-admin-token", b"").decode("latin-1")
+            return _is_admin(token)
+    if sample_rates:
+        path = scope["path"]
+        for prefix, rate in sample_rates.items():
+            if path.startswith(prefix):
+                return random.random() < rate
+    return False
+
+class ProfilingMiddleware:
+    """Plain ASGI middleware; only installed when profiling is enabled"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _should_profile(scope):
+            return await self.app(scope, receive, send)
+
+        profile_id = next(_profile_ids)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", str(profile_id).encode())]
+            await send(message)
+
+        started = time.time()
+        start = time.perf_counter()
+        counter = sampler.start(threading.get_ident())
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop(counter)
+            _profiles.append({
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "started": started,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                "samples": sum(counter.values()),
+                "stacks": counter
+            })
+
+# ---------------------- CPU PROFILE ENDPOINTS ---------------------- #
+class SampleRatesRequest(BaseModel):
+    rates: dict[str, float]  # path prefix -> fraction of requests to profile
+
+@router.get("/profiling/profiles", dependencies=[Depends(require_profiling_admin)])
+async def list_profiles():
+    return {"profiles": [{key: value for key, value in profile.items() if key != "stacks"} for profile in reversed(_profiles)]}
+
+@router.get("/profiling/profiles/{profile_id}", dependencies=[Depends(require_profiling_admin)])
+async def get_profile(profile_id: int):
+    """Folded stacks (one 'frame;frame;frame count' line per stack) for flamegraph tools"""
+    for profile in _profiles:
+        if profile["id"] == profile_id:
+            return PlainTextResponse(folded(profile["stacks"]))
+    raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+
+@router.get("/profiling/sample-rates", dependencies=[Depends(require_profiling_admin)])
+async def get_sample_rates():
+    return {"rates": sample_rates}
+
+@router.put("/profiling/sample-rates", dependencies=[Depends(require_profiling_admin)])
+async def set_sample_rates(data: SampleRatesRequest):
+    if any(not 0 <= rate <= 1 for rate in data.rates.values()):
+        raise HTTPException(status_code=400, detail="Sample rates must be between 0 and 1")
+    sample_rates.clear()
+    sample_rates.update({prefix: rate for prefix, rate in data.rates.items() if rate > 0})
+    return {"rates": sample_rates}
+
+# ---------------------- MEMORY PROFILE ENDPOINTS ---------------------- #
+def _stat_entry(stat):
+    frame = stat.traceback[0]
+    return {"file": frame.filename, "line": frame.lineno, "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+
+@router.post("/profiling/memory/start", dependencies=[Depends(require_profiling_admin)])
+async def start_memory_tracing():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    return {"tracing": True, "frames": tracemalloc.get_traceback_limit()}
+
+@router.post("/profiling/memory/stop", dependencies=[Depends(require_profiling_admin)])
+async def stop_memory_tracing():
+    tracemalloc.stop()
+    _memory_snapshots.clear()
+    return {"tracing": False}
+
+@router.post("/profiling/memory/snapshots", dependencies=[Depends(require_profiling_admin)])
+async def take_memory_snapshot(top: int = 25):
+    if not tracemalloc.is_tracing():
+        raise HTTPException(status_code=409, detail="Memory tracing is not started")
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")
+    ])
+    snapshot_id = next(_memory_snapshot_ids)
+    _memory_snapshots[snapshot_id] = snapshot
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "snapshot_id": snapshot_id,
+        "traced_kb": round(current / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+        "top": [_stat_entry(stat) for stat in snapshot.statistics("lineno")[:top]]
+    }
+
+@router.get("/profiling/memory/diff", dependencies=[Depends(require_profiling_admin)])
+async def diff_memory_snapshots(base: int, target: int, top: int = 25):
+    """Allocation growth from snapshot `base` to snapshot `target`, largest first"""
+    if base not in _memory_snapshots or target not in _memory_snapshots:
+        raise HTTPException(status_code=404, detail="Unknown snapshot id")
+    stats = _memory_snapshots[target].compare_to(_memory_snapshots[base], "lineno")
+    return {"diff": [
+        {**_stat_entry(stat), "size_diff_kb": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff}
+        for stat in stats[:top]
+    ]}
+
+@router.get("/profiling/memory/snapshots/{snapshot_id}/folded", dependencies=[Depends(require_profiling_admin)])
+async def get_memory_snapshot_folded(snapshot_id: int):
+    """Live allocations as folded stacks weighted by bytes"""
+    snapshot = _memory_snapshots.get(snapshot_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Snapshot {snapshot_id} not found")
+    counter = Counter()
+    for stat in snapshot.statistics("traceback"):
+        # Frames are ordered oldest first, as folded stacks expect
+        stack = ";".join(f"{os.path.basename(frame.filename)}:{frame.lineno}" for frame in stat.traceback)
+        counter[stack] += stat.size
+    return PlainTextResponse(folded(counter))
@@ -0,0 +1,132 @@
+from fastapi import HTTPException
+import datetime
+import difflib
+import re
+
+from api.db import SUMMARY_REVISIONS, collection
+
+# ---------------------- REVISION STORAGE HELPERS ---------------------- #
+# Revisions are append-only. Most entries store only a delta against the
+# previous revision; a full snapshot is written every REVISION_SNAPSHOT_INTERVAL
+# revisions so rebuilding any version replays at most that many deltas.
+# Revision N is the summary's content at document version N.
+REVISION_SNAPSHOT_INTERVAL = 20
+
+def _revision_key(kind: str, chapter_id: str, section_id: str | None):
+    return {"kind": kind, "chapter_id": chapter_id, "section_id": section_id}
+
+def _to_items(kind: str, content):
+    """full_summary diffs per sentence, section_summary diffs per word/whitespace token"""
+    if kind == "full_summary":
+        return list(content or [])
+    return [token for token in re.split(r"(\s+)", content or "") if token]
+
+def _from_items(kind: str, items: list):
+    if kind == "full_summary":
+        return items
+    return "".join(items)
+
+def _compute_delta(old_items: list, new_items: list):
+    """Return [[start, end, replacement], ...] for every changed run of old_items"""
+    matcher = difflib.SequenceMatcher(None, old_items, new_items, autojunk=False)
+    return [
+        [i1, i2, new_items[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+def _apply_delta(items: list, delta: list):
+    items = list(items)
+    # Apply from the end so earlier offsets stay valid
+    for start, end, replacement in reversed(delta):
+        items[start:end] = replacement
+    return items
+
+async def record_summary_revision(kind: str, chapter_id: str, section_id: str | None, old_doc, new_content, delta: list = None, initial_revision: int = 0):
+    """Append the revision produced by an edit and return its number (the document's new version).
+
+    old_doc is the summary document as it was before the edit (None on create,
+    in which case a snapshot is stored as `initial_revision`).
+    Callers that already know the change may pass `delta` instead of diffing.
+    """
+    key = _revision_key(kind, chapter_id, section_id)
+    now = datetime.datetime.utcnow()
+    entries = []
+
+    if old_doc is None:
+        revision = initial_revision
+        entries.append({**key, "revision": revision, "type": "snapshot", "content": new_content, "created_at": now})
+    else:
+        old_content = old_doc.get(kind)
+        revision = old_doc.get("version")
+        if revision is None:
+            # First tracked edit: keep the existing text as the baseline snapshot
+            revision = 0
+            entries.append({**key, "revision": 0, "type": "snapshot", "content": old_content, "created_at": now})
+        revision += 1
+        if revision % REVISION_SNAPSHOT_INTERVAL == 0:
+            if new_content is None:
+                new_content = _from_items(kind, _apply_delta(_to_items(kind, old_content), delta))
+            entries.append({**key, "revision": revision, "type": "snapshot", "content": new_content, "created_at": now})
+        else:
+            if delta is None:
+                delta = _compute_delta(_to_items(kind, old_content), _to_items(kind, new_content))
+            entries.append({**key, "revision": revision, "type": "delta", "delta": delta, "created_at": now})
+
+    # The document update has already been applied atomically with its version
+    # bump, so each revision number is written by exactly one request. A missing
+    # revision breaks every later one up to the next snapshot, so a failure is
+    # reported to the caller rather than only logged.
+    try:
+        await collection(SUMMARY_REVISIONS).insert_many(entries)
+    except Exception as e:
+        print(f"❌ Failed to record {kind} revision {revision} for chapter '{chapter_id}': {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Saved as version {revision}, but its revision could not be recorded: {str(e)}"
+        )
+    return revision
+
+async def load_summary_revision(kind: str, chapter_id: str, section_id: str | None, revision: int):
+    """Rebuild the content at `revision` from the nearest snapshot, or None if it doesn't exist.
+    Raises a 500 if a revision between the snapshot and `revision` is missing."""
+    key = _revision_key(kind, chapter_id, section_id)
+    snapshot = await collection(SUMMARY_REVISIONS).find_one(
+        {**key, "type": "snapshot", "revision": {"$lte": revision}},
+        sort=[("revision", -1)]
+    )
+    if not snapshot:
+        return None
+
+    items = _to_items(kind, snapshot["content"])
+    current = snapshot["revision"]
+    cursor = collection(SUMMARY_REVISIONS).find(
+        {**key, "revision": {"$gt": current, "$lte": revision}}
+    ).sort("revision", 1)
+    async for entry in cursor:
+        if entry["revision"] != current + 1:
+            # A lost revision; replaying past it would return wrong content
+            raise HTTPException(
+                status_code=500,
+                detail=f"Revision history is missing revision {current + 1}, cannot rebuild revision {revision}"
+            )
+        items = _apply_delta(items, entry["delta"])
+        current = entry["revision"]
+
+    if current != revision:
+        return None
+    return _from_items(kind, items)
+
+async def list_summary_revisions(kind: str, chapter_id: str, section_id: str | None, limit: int):
+    revisions = []
+    cursor = collection(SUMMARY_REVISIONS).find(
+        _revision_key(kind, chapter_id, section_id),
+        {"_id": 0, "revision": 1, "type": 1, "created_at": 1}
+    ).sort("revision", -1).limit(limit)
+    async for entry in cursor:
+        revisions.append({
+            "revision": entry["revision"],
+            "type": entry["type"],
+            "created_at": entry["created_at"].isoformat()
+        })
+    return revisions
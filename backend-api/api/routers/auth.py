@@ -0,0 +1,235 @@
+from bson import ObjectId
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+import datetime
+import secrets
+
+from api.db import PASSWORD_RESETS, SESSIONS, USERS, collection
+from api.mail import send_password_reset_email
+from api.passwords import hash_password, password_needs_rehash, verify_password
+from api.sessions import (
+    SESSION_TOKEN_MODE, SESSION_TTL, decode_signed_session_token, is_signed_session_token,
+    issue_signed_session_token, resolve_session, revoke_signed_sessions
+)
+
+router = APIRouter(tags=["auth"])
+
+# ====================== AUTHENTICATION ENDPOINTS ====================== #
+
+# ---------------------- PYDANTIC MODELS FOR AUTH ---------------------- #
+class UserSignupRequest(BaseModel):
+    username: str
+    email: str
+    password: str
+    domain: str 
+
+class UserLoginRequest(BaseModel):
+    username: str
+    password: str
+
+class ForgotPasswordRequest(BaseModel):
+    email: str
+
+class ResetPasswordRequest(BaseModel):
+    token: str
+    new_password: str
+
+# ---------------------- SIGNUP ---------------------- #
+@router.post("/signup")
+async def signup(user_data: UserSignupRequest):
+    try:
+        # Check if user already exists
+        existing_user = await collection(USERS).find_one({
+            "$or": [
+                {"username": user_data.username},
+                {"email": user_data.email}
+            ]
+        })
+        
+        if existing_user:
+            raise HTTPException(status_code=400, detail="Username or email already exists")
+        
+        # Hash password
+        hashed_password = await hash_password(user_data.password)
+        
+        # Create new user
+        await collection(USERS).insert_one({
+            "username": user_data.username,
+            "email": user_data.email,
+            "password": hashed_password,
+            "domain": user_data.domain,
+            "created_at": datetime.datetime.utcnow()
+        })
+        
+        return JSONResponse(content={
+            "message": "User created successfully",
+            "username": user_data.username
+        }, status_code=201)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating user: {str(e)}")
+
+# ---------------------- LOGIN ---------------------- #
+@router.post("/login")
+async def login(user_data: UserLoginRequest):
+    try:
+        # Find user, then check the password off the event loop
+        user = await collection(USERS).find_one({"username": user_data.username})
+        
+        if not user or not await verify_password(user_data.password, user.get("password")):
+            raise HTTPException(status_code=401, detail="Invalid username or password")
+        
+        # Upgrade legacy SHA-256 (or outdated scrypt cost) hashes now that we know the password
+        if password_needs_rehash(user["password"]):
+            await collection(USERS).update_one(
+                {"_id": user["_id"], "password": user["password"]},
+                {"$set": {"password": await hash_password(user_data.password)}}
+            )
+        
+        # Create session token
+        if SESSION_TOKEN_MODE == "signed":
+            session_token = issue_signed_session_token(
+                user["username"], str(user["_id"]), user.get("session_generation", 0), user.get("domain")
+            )
+        else:
+            session_token = secrets.token_hex(32)
+            
+            # Store session
+            await collection(SESSIONS).insert_one({
+                "user_id": str(user["_id"]),
+                "username": user["username"],
+                "domain": user.get("domain"),
+                "session_token": session_token,
+                "created_at": datetime.datetime.utcnow(),
+                "expires_at": datetime.datetime.utcnow() + SESSION_TTL
+            })
+        
+        return {
+            "message": "Login successful",
+            "session_token": session_token,
+            "username": user["username"],
+            "domain": user.get("domain")
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error during login: {str(e)}")
+
+# ---------------------- VERIFY SESSION ---------------------- #
+@router.get("/verify-session")
+async def verify_session(session_token: str):
+    try:
+        session = await resolve_session(session_token)
+        
+        if not session:
+            raise HTTPException(status_code=401, detail="Invalid or expired session")
+        
+        return {
+            "valid": True,
+            "username": session["username"],
+            "domain": session["domain"]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error verifying session: {str(e)}")
+
+# ---------------------- LOGOUT ---------------------- #
+@router.post("/logout")
+async def logout(session_token: str):
+    try:
+        if is_signed_session_token(session_token):
+            # Signed tokens can't be deleted individually; this ends all of the user's sessions
+            claims = decode_signed_session_token(session_token)
+            if claims:
+                await revoke_signed_sessions(claims["uid"])
+        else:
+            await collection(SESSIONS).delete_one({"session_token": session_token})
+        return {"message": "Logout successful"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error during logout: {str(e)}")
+
+# ====================== FORGOT PASSWORD ENDPOINT ====================== #
+@router.post("/forgot-password")
+async def forgot_password(request: ForgotPasswordRequest):
+    try:
+        # Find user by email
+        user = await collection(USERS).find_one({"email": request.email})
+
+        if not user:
+            # For security, don't reveal if email exists
+            return JSONResponse(content={
+                "message": "If that email address is in our database, we will send you a password reset link."
+            })
+
+        # Generate secure reset token
+        reset_token = secrets.token_urlsafe(32)
+
+        # Store reset token in database (with expiration)
+        await collection(PASSWORD_RESETS).insert_one({
+            "user_id": str(user["_id"]),
+            "email": request.email,
+            "reset_token": reset_token,
+            "created_at": datetime.datetime.utcnow(),
+            "expires_at": datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        })
+
+        # Send email with reset link
+        email_sent = await send_password_reset_email(request.email, reset_token)
+        
+        if not email_sent:
+            # Fallback: Return token for development
+            return JSONResponse(content={
+                "message": "Password reset instructions have been sent to your email.",
+                "development_token": reset_token  # Remove in production
+            })
+
+        return JSONResponse(content={
+            "message": "Password reset instructions have been sent to your email."
+        })
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+# ====================== RESET PASSWORD ENDPOINT ====================== #
+@router.post("/reset-password")
+async def reset_password(request: ResetPasswordRequest):
+    try:
+        # Find valid reset token
+        reset_record = await collection(PASSWORD_RESETS).find_one({
+            "reset_token": request.token,
+            "expires_at": {"$gt": datetime.datetime.utcnow()}
+        })
+
+        if not reset_record:
+            raise HTTPException(status_code=400, detail="Invalid or expired reset token")
+
+        # Hash new password
+        hashed_password = await hash_password(request.new_password)
+
+        # Update user password (user_id is stored as a string)
+        await collection(USERS).update_one(
+            {"_id": ObjectId(reset_record["user_id"])},
+            {"$set": {"password": hashed_password}}
+        )
+
+        # Delete used reset token
+        await collection(PASSWORD_RESETS).delete_one({"reset_token": request.token})
+
+        # Delete all user sessions (for security)
+        await collection(SESSIONS).delete_many({"user_id": reset_record["user_id"]})
+        await revoke_signed_sessions(reset_record["user_id"])
+
+        return JSONResponse(content={
+            "message": "Password has been reset successfully. You can now login with your new password."
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error resetting password: {str(e)}")
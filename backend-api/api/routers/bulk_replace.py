@@ -0,0 +1,360 @@
+from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+import os
+import re
+
+from api import coalesce, word_snapshot
+from api.activity import log_activity
+from api.concurrency import NEXT_VERSION
+from api.db import DOMAIN_WORDS, FULL_SUMMARY, SECTION_SUMMARY, SUMMARY_SENTENCES, collection
+from api.revisions import record_summary_revision
+from api.sentence_store import SENTENCE_STORAGE, rewrite_sentences
+from api.sync import utc_now
+
+router = APIRouter(tags=["bulk replace"])
+
+# ====================== BULK FIND AND REPLACE ====================== #
+# Replaces a literal or regex across many documents without a client
+# read-modify-write per sentence. Matching documents are read in batches of
+# BULK_REPLACE_BATCH_SIZE and each batch is rewritten by one update_many with a
+# pipeline update, so the replacement itself runs inside Mongo. A batch only
+# updates documents whose version is unchanged since they were read; others are
+# reported as skipped. Summary edits still get a revision each.
+#
+# Literal, case-sensitive finds use $replaceAll. Regex or case-insensitive
+# finds are rebuilt from $regexFindAll matches; the replacement is literal
+# (no backreferences). Matching, counting, the dry-run preview and the applied
+# update all run these same expressions in Mongo, so the preview shows exactly
+# what will be written (Mongo's \w, \b and case folding are ASCII-only, unlike
+# Python's). Revisions are recorded from the values Mongo stored.
+#
+# The full_summary scope also covers chapters in sentence storage
+# (api.sentence_store): their matching sentences are rewritten one chapter at
+# a time, after claiming the chapter's version like any other sentence edit.
+BULK_REPLACE_BATCH_SIZE = int(os.environ.get("BULK_REPLACE_BATCH_SIZE", 200))
+
+# scope name -> (collection, activity tool, key fields, {field: is_array})
+BULK_REPLACE_TARGETS = {
+    "full_summary": (FULL_SUMMARY, "Full Summary", ("chapter_id",), {"full_summary": True}),
+    "section_summary": (SECTION_SUMMARY, "Section Summary", ("chapter_id", "section_id"), {"section_summary": False}),
+    "domain_words": (DOMAIN_WORDS, "Domain Words", ("chapter_id", "domain_id"), {"definition": False, "name": False}),
+}
+
+# ---------------------- PYDANTIC MODELS FOR BULK REPLACE ---------------------- #
+class BulkReplaceRequest(BaseModel):
+    find: str
+    replace: str
+    regex: bool = False
+    case_sensitive: bool = True
+    chapter_ids: list[str] | None = None  # default: every chapter
+    collections: list[str] | None = None  # keys of BULK_REPLACE_TARGETS, default: all
+    fields: list[str] | None = None  # default: every field of the chosen collections
+    dry_run: bool = True
+    page: int = 1  # dry-run preview page
+    page_size: int = 50
+
+# ---------------------- REPLACEMENT EXPRESSIONS ---------------------- #
+def _matches_expr(value, pattern: str, options: str):
+    """Non-empty matches in `value`; zero-width ones (\\b, lookarounds, x*) replace nothing"""
+    return {"$filter": {
+        "input": {"$regexFindAll": {"input": value, "regex": pattern, "options": options}},
+        "as": "match",
+        "cond": {"$gt": [{"$strLenCP": "$$match.match"}, 0]}
+    }}
+
+def _replace_expr(value, data: BulkReplaceRequest, pattern: str, options: str):
+    """Aggregation expression replacing every match in the string `value`"""
+    if not data.regex and data.case_sensitive:
+        replaced = {"$replaceAll": {"input": value, "find": data.find, "replacement": data.replace}}
+    else:
+        # Copy the text between matches and substitute each match; idx is in code points
+        rebuilt = {"$reduce": {
+            "input": _matches_expr(value, pattern, options),
+            "initialValue": {"out": "", "pos": 0},
+            "in": {
+                "out": {"$concat": [
+                    "$$value.out",
+                    {"$substrCP": [value, "$$value.pos", {"$subtract": ["$$this.idx", "$$value.pos"]}]},
+                    data.replace
+                ]},
+                "pos": {"$add": ["$$this.idx", {"$strLenCP": "$$this.match"}]}
+            }
+        }}
+        replaced = {"$let": {"vars": {"r": rebuilt}, "in": {"$concat": [
+            "$$r.out",
+            {"$substrCP": [value, "$$r.pos", {"$subtract": [{"$strLenCP": value}, "$$r.pos"]}]}
+        ]}}}
+    return {"$cond": [{"$eq": [{"$type": value}, "string"]}, replaced, value]}
+
+def _field_expr(field: str, is_array: bool, data: BulkReplaceRequest, pattern: str, options: str):
+    if is_array:
+        return {"$map": {"input": f"${field}", "as": "item", "in": _replace_expr("$$item", data, pattern, options)}}
+    return _replace_expr(f"${field}", data, pattern, options)
+
+def _occurrences_expr(value, pattern: str, options: str):
+    return {"$cond": [
+        {"$eq": [{"$type": value}, "string"]},
+        {"$size": _matches_expr(value, pattern, options)},
+        0
+    ]}
+
+def _array_or_empty(field: str):
+    return {"$cond": [{"$isArray": f"${field}"}, f"${field}", []]}
+
+def _field_occurrences_expr(field: str, is_array: bool, pattern: str, options: str):
+    if is_array:
+        return {"$sum": {"$map": {"input": _array_or_empty(field), "as": "item", "in": _occurrences_expr("$$item", pattern, options)}}}
+    return _occurrences_expr(f"${field}", pattern, options)
+
+def _preview_expr(field: str, is_array: bool, data: BulkReplaceRequest, pattern: str, options: str):
+    """[{before, after, occurrences}] per value of `field`, computed as the update would"""
+    def item(value):
+        return {
+            "before": value,
+            "after": _replace_expr(value, data, pattern, options),
+            "occurrences": _occurrences_expr(value, pattern, options)
+        }
+    if is_array:
+        return {"$map": {"input": _array_or_empty(field), "as": "item", "in": item("$$item")}}
+    return [item(f"${field}")]
+
+def _targets(data: BulkReplaceRequest):
+    names = data.collections or list(BULK_REPLACE_TARGETS)
+    unknown = [name for name in names if name not in BULK_REPLACE_TARGETS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown collections {unknown}, expected some of {list(BULK_REPLACE_TARGETS)}")
+    targets = []
+    for name in names:
+        collection_name, tool, key_fields, fields = BULK_REPLACE_TARGETS[name]
+        chosen = {field: is_array for field, is_array in fields.items() if not data.fields or field in data.fields}
+        if chosen:
+            targets.append((name, collection_name, tool, key_fields, chosen))
+    if not targets:
+        raise HTTPException(status_code=400, detail="No fields in scope")
+    return targets
+
+def _match_filter(data: BulkReplaceRequest, fields: dict, pattern: str, options: str):
+    query = {"$or": [{field: {"$regex": pattern, "$options": options}} for field in fields]}
+    if data.regex:
+        # $regex also matches where the pattern only matches empty strings
+        query["$expr"] = {"$gt": [
+            {"$add": [_field_occurrences_expr(field, is_array, pattern, options) for field, is_array in fields.items()]}, 0
+        ]}
+    if data.chapter_ids:
+        query["chapter_id"] = {"$in": data.chapter_ids}
+    return query
+
+def _sentence_match_filter(data: BulkReplaceRequest, pattern: str, options: str):
+    """Matching sentences of chapters in sentence storage"""
+    query = {"text": {"$regex": pattern, "$options": options}}
+    if data.regex:
+        query["$expr"] = {"$gt": [_occurrences_expr("$text", pattern, options), 0]}
+    if data.chapter_ids:
+        query["chapter_id"] = {"$in": data.chapter_ids}
+    return query
+
+# ---------------------- DRY RUN PREVIEW ---------------------- #
+async def _preview_items(target: tuple, data: BulkReplaceRequest, pattern: str, options: str):
+    name, collection_name, _, key_fields, fields = target
+    pipeline = [
+        {"$match": _match_filter(data, fields, pattern, options)},
+        {"$sort": {"_id": 1}},
+        {"$project": {
+            "_id": 0,
+            **{field: 1 for field in key_fields},
+            **{f"preview_{field}": _preview_expr(field, is_array, data, pattern, options) for field, is_array in fields.items()}
+        }}
+    ]
+    async for doc in collection(collection_name).aggregate(pipeline):
+        for field, is_array in fields.items():
+            for index, value in enumerate(doc[f"preview_{field}"]):
+                if value["occurrences"]:
+                    item = {"collection": name, **{key: doc.get(key) for key in key_fields}, "field": field}
+                    if is_array:
+                        item["index"] = index
+                    yield {**item, **value}
+
+    if name == "full_summary":
+        pipeline = [
+            {"$match": _sentence_match_filter(data, pattern, options)},
+            {"$sort": {"chapter_id": 1, "position": 1}},
+            {"$project": {"_id": 0, "chapter_id": 1, "position": 1, "preview": _preview_expr("text", False, data, pattern, options)}}
+        ]
+        async for doc in collection(SUMMARY_SENTENCES).aggregate(pipeline):
+            yield {"collection": name, "chapter_id": doc["chapter_id"], "field": name, "index": doc["position"], **doc["preview"][0]}
+
+async def _preview(data: BulkReplaceRequest, targets: list, pattern: str, options: str):
+    skip = (data.page - 1) * data.page_size
+    items, matched_documents = [], {}
+    for target in targets:
+        name, collection_name, _, _, fields = target
+        matched_documents[name] = await collection(collection_name).count_documents(_match_filter(data, fields, pattern, options))
+        if name == "full_summary":
+            matched_documents[name] += len(await collection(SUMMARY_SENTENCES).distinct("chapter_id", _sentence_match_filter(data, pattern, options)))
+        if len(items) > data.page_size:
+            continue
+        async for item in _preview_items(target, data, pattern, options):
+            if skip:
+                skip -= 1
+                continue
+            items.append(item)
+            if len(items) > data.page_size:
+                break
+    return {
+        "dry_run": True,
+        "matched_documents": matched_documents,
+        "preview": items[:data.page_size],
+        "page": data.page,
+        "page_size": data.page_size,
+        "has_more": len(items) > data.page_size
+    }
+
+# ---------------------- APPLY IN BATCHES ---------------------- #
+def _same_instant(stored, stamp: datetime):
+    # Mongo keeps milliseconds and returns naive UTC datetimes
+    return isinstance(stored, datetime) and \
+        abs(stored.replace(tzinfo=None) - stamp.replace(tzinfo=None)) < timedelta(milliseconds=1)
+
+async def _apply_batch(target: tuple, batch: list, data: BulkReplaceRequest, pattern: str, options: str):
+    name, collection_name, _, key_fields, fields = target
+
+    # Only documents still at the version we read; a missing version matches null
+    stamp = utc_now()
+    await collection(collection_name).update_many(
+        {"$or": [{"_id": doc["_id"], "version": doc.get("version")} for doc in batch]},
+        [{"$set": {
+            **{field: _field_expr(field, is_array, data, pattern, options) for field, is_array in fields.items()},
+            "version": NEXT_VERSION,
+            "updated_at": stamp
+        }}]
+    )
+    # Ours are the documents exactly one version past what we read and carrying
+    # our timestamp; the rest were edited concurrently before our update reached them
+    stored = {}
+    projection = {"version": 1, "updated_at": 1, **{field: 1 for field in fields}}
+    async for doc in collection(collection_name).find({"_id": {"$in": [doc["_id"] for doc in batch]}}, projection):
+        stored[doc["_id"]] = doc
+    updated = [
+        doc for doc in batch
+        if doc["_id"] in stored
+        and stored[doc["_id"]].get("version") == (doc.get("version") or 0) + 1
+        and _same_instant(stored[doc["_id"]].get("updated_at"), stamp)
+    ]
+
+    revision_failures = 0
+    if name in ("full_summary", "section_summary"):
+        for doc in updated:
+            try:
+                await record_summary_revision(
+                    name, doc["chapter_id"], doc.get("section_id"), doc, stored[doc["_id"]].get(name)
+                )
+            except HTTPException:
+                revision_failures += 1
+    return len(updated), sum(doc["occurrences"] for doc in updated), revision_failures
+
+async def _apply_sentence_chapters(data: BulkReplaceRequest, pattern: str, options: str):
+    """(matched, changed, occurrences, revision failures) over chapters in sentence storage"""
+    matched = changed = occurrences = revision_failures = 0
+    query = _sentence_match_filter(data, pattern, options)
+    for chapter_id in await collection(SUMMARY_SENTENCES).distinct("chapter_id", query):
+        matched += 1
+        current = await collection(FULL_SUMMARY).find_one({"chapter_id": chapter_id, "storage": SENTENCE_STORAGE}, {"version": 1})
+        if not current:
+            continue  # converted back to array storage meanwhile
+        sentences = [doc async for doc in collection(SUMMARY_SENTENCES).find(
+            {**query, "chapter_id": chapter_id},
+            {"_id": 1, "occurrences": _occurrences_expr("$text", pattern, options)}
+        )]
+        try:
+            old_doc, delta = await rewrite_sentences(
+                chapter_id, current, [doc["_id"] for doc in sentences], _replace_expr("$text", data, pattern, options)
+            )
+        except HTTPException:
+            continue  # edited concurrently
+        changed += 1
+        occurrences += sum(doc["occurrences"] for doc in sentences)
+        try:
+            await record_summary_revision("full_summary", chapter_id, None, old_doc, None, delta=delta)
+        except HTTPException:
+            revision_failures += 1
+    return matched, changed, occurrences, revision_failures
+
+async def _apply(data: BulkReplaceRequest, targets: list, pattern: str, options: str):
+    results = {}
+    for target in targets:
+        name, collection_name, tool, key_fields, fields = target
+        matched = changed = occurrences = revision_failures = 0
+        projection = {
+            **{field: 1 for field in key_fields},
+            **{field: 1 for field in fields},
+            "version": 1,
+            # Counted by Mongo on the text as read, the same way the update replaces it
+            "occurrences": {"$add": [_field_occurrences_expr(field, is_array, pattern, options) for field, is_array in fields.items()]}
+        }
+        cursor = collection(collection_name).find(_match_filter(data, fields, pattern, options), projection) \
+            .sort("_id", 1).batch_size(BULK_REPLACE_BATCH_SIZE)
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) < BULK_REPLACE_BATCH_SIZE:
+                continue
+            batch_changed, batch_occurrences, batch_failures = await _apply_batch(target, batch, data, pattern, options)
+            matched, changed = matched + len(batch), changed + batch_changed
+            occurrences, revision_failures = occurrences + batch_occurrences, revision_failures + batch_failures
+            batch = []
+        if batch:
+            batch_changed, batch_occurrences, batch_failures = await _apply_batch(target, batch, data, pattern, options)
+            matched, changed = matched + len(batch), changed + batch_changed
+            occurrences, revision_failures = occurrences + batch_occurrences, revision_failures + batch_failures
+        if name == "full_summary":
+            sentence_matched, sentence_changed, sentence_occurrences, sentence_failures = await _apply_sentence_chapters(data, pattern, options)
+            matched, changed = matched + sentence_matched, changed + sentence_changed
+            occurrences, revision_failures = occurrences + sentence_occurrences, revision_failures + sentence_failures
+
+        if changed:
+            if collection_name == DOMAIN_WORDS:
+                await word_snapshot.notify_write()
+            log_activity("replaced", tool, f"Bulk replaced '{data.find}' -> '{data.replace}' in {changed} documents ({occurrences} occurrences)")
+        results[name] = {
+            "matched_documents": matched,
+            "changed_documents": changed,
+            "occurrences": occurrences,
+            "skipped_concurrent": matched - changed
+        }
+        if revision_failures:
+            results[name]["revision_failures"] = revision_failures
+    return {"dry_run": False, "results": results}
+
+# ---------------------- BULK REPLACE ---------------------- #
+@router.post("/bulk-replace")
+async def bulk_replace(data: BulkReplaceRequest):
+    """Find and replace across summaries and domain words; dry_run (the default) only previews"""
+    if not data.find:
+        raise HTTPException(status_code=400, detail="find must not be empty")
+    if data.page < 1 or not 1 <= data.page_size <= 500:
+        raise HTTPException(status_code=400, detail="page must be >= 1 and page_size between 1 and 500")
+    pattern = data.find if data.regex else re.escape(data.find)
+    try:
+        # Early validation only; matching itself runs in Mongo
+        compiled = re.compile(pattern, 0 if data.case_sensitive else re.IGNORECASE)
+    except re.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid regex: {str(e)}")
+    if compiled.search(""):
+        raise HTTPException(status_code=400, detail="find must not match an empty string")
+    options = "" if data.case_sensitive else "i"
+    targets = _targets(data)
+
+    try:
+        if data.dry_run:
+            return await _preview(data, targets, pattern, options)
+        try:
+            return await _apply(data, targets, pattern, options)
+        finally:
+            # Not counted by WriteGenerationMiddleware, which can't tell a dry run
+            coalesce.note_write()
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error in bulk replace: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error in bulk replace: {str(e)}")
@@ -0,0 +1,371 @@
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import json
+import re
+
+from api import word_snapshot
+from api.activity import log_activity
+from api.batch import BatchGetRequest, batch_get
+from api.coalesce import single_flight
+from api.concurrency import diagnose_failed_update, get_expected_version, upsert_document, version_filter
+from api.db import DOMAIN_WORDS, collection
+from api.routers.word_audio import delete_audio_files
+from api.sync import changed_since, get_since, new_watermark, record_tombstone, sync_fields, utc_now
+
+router = APIRouter(tags=["domain words"])
+
+# ====================== DOMAIN WORDS ENDPOINTS ====================== #
+
+# ---------------------- PYDANTIC MODELS FOR DOMAIN WORDS ---------------------- #
+# class DomainWordUpdateRequest(BaseModel):
+#     definition: str
+#     translations: dict
+#     word_structure: dict
+
+class DomainWordUpdateRequest(BaseModel):
+    definition: str = None  # Make optional
+    translations: dict = None  # Make optional  
+    word_structure: dict = None  # Make optional
+    domain_id: str = None  # Add domain_id field for updating ID
+    name: str = None  # Add other fields that might need updating
+    is_mwe: bool = None
+    mwe_type: str = None
+
+class DomainWordCreateRequest(BaseModel):
+    chapter_id: str
+    domain_id: str
+    definition: str
+    translations: dict
+    word_structure: dict
+    is_mwe: bool = False
+    mwe_type: str = None
+    name: str
+    tokens_with_pos: list
+
+# Fields returned by word reads. Legacy inline audio_binary is never read back;
+# audio lives in GridFS (see word_audio) and is exposed as audio_url.
+WORD_FIELDS = ["chapter_id", "domain_id", "definition", "is_mwe", "mwe_type", "name",
+               "tokens_with_pos", "word_structure", "version", "audio"]
+LANG_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+def parse_langs(lang: str = None):
+    """Languages from a `lang=en` / `lang=en,hi` query parameter, None for all"""
+    if not lang:
+        return None
+    langs = [code.strip() for code in lang.split(",") if code.strip()]
+    for code in langs:
+        if not LANG_PATTERN.match(code):
+            raise HTTPException(status_code=400, detail=f"Invalid language code '{code}'")
+    return langs or None
+
+def word_projection(langs=None):
+    """Server-side projection, keeping only the requested translations"""
+    projection = {field: 1 for field in WORD_FIELDS}
+    if langs is None:
+        projection["translations"] = 1
+    else:
+        projection.update({f"translations.{code}": 1 for code in langs})
+    return projection
+
+def _audio_url(doc):
+    if not doc.get("audio"):
+        return None
+    return f"/domain-words/audio/{doc.get('chapter_id', '')}/{doc.get('domain_id', '')}"
+
+def _domain_word_response(doc):
+    # Convert ObjectId to string; audio is only referenced by URL
+    return {
+        "_id": str(doc["_id"]),
+        "chapter_id": doc.get("chapter_id", ""),
+        "domain_id": doc.get("domain_id", ""),
+        "definition": doc.get("definition", ""),
+        "is_mwe": doc.get("is_mwe", False),
+        "mwe_type": doc.get("mwe_type", ""),
+        "name": doc.get("name", ""),
+        "tokens_with_pos": doc.get("tokens_with_pos", []),
+        "translations": doc.get("translations", {}),
+        "word_structure": doc.get("word_structure", {}),
+        "version": doc.get("version", 0),
+        "audio_url": _audio_url(doc)
+    }
+
+def _project_translations(word: dict, langs=None):
+    # Snapshot words carry every language; mirror the Mongo projection
+    if langs is not None:
+        translations = word["translations"] or {}
+        word["translations"] = {code: translations[code] for code in langs if code in translations}
+    return word
+
+# ---------------------- GET ALL DOMAIN WORDS ---------------------- #
+@router.get("/all-domain-words")
+async def get_all_domain_words(langs: list | None = Depends(parse_langs), since: datetime | None = Depends(get_since)):
+    # Identical concurrent listings share one query and one encoded body
+    key = ("/all-domain-words", tuple(langs) if langs is not None else None, since)
+    body = await single_flight(key, lambda: _encode_all_domain_words(langs, since))
+    return Response(content=body, media_type="application/json")
+
+async def _encode_all_domain_words(langs, since):
+    return JSONResponse(content=jsonable_encoder(await _all_domain_words(langs, since))).body
+
+async def _all_domain_words(langs, since):
+    snapshot = await word_snapshot.current_snapshot() if since is None else None
+    if snapshot:
+        build_time = datetime.fromtimestamp(snapshot.build_started_ns / 1e9, timezone.utc)
+        return {
+            "domain_words": [_project_translations(snapshot.word(i), langs) for i in range(len(snapshot))],
+            "watermark": new_watermark(build_time)
+        }
+    try:
+        watermark = new_watermark()
+        domain_words = []
+        async for doc in collection(DOMAIN_WORDS).find(changed_since(since), word_projection(langs)):
+            domain_words.append(_domain_word_response(doc))
+        return {"domain_words": domain_words, **await sync_fields(DOMAIN_WORDS, since, watermark, domain_words, ("chapter_id", "domain_id"))}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching domain words: {str(e)}")
+
+# ---------------------- GET DOMAIN WORD ---------------------- #
+@router.get("/domain-words/{chapter_id}/{domain_id}")
+async def get_domain_word(chapter_id: str, domain_id: str, langs: list | None = Depends(parse_langs)):
+    snapshot = await word_snapshot.current_snapshot()
+    if snapshot:
+        word = snapshot.get(chapter_id, domain_id)
+        if not word:
+            raise HTTPException(status_code=404, detail=f"Domain word '{domain_id}' not found for chapter '{chapter_id}'")
+        return _project_translations(word, langs)
+    
+    doc = await collection(DOMAIN_WORDS).find_one({
+        "chapter_id": chapter_id,
+        "domain_id": domain_id
+    }, word_projection(langs))
+    if not doc:
+        raise HTTPException(status_code=404, detail=f"Domain word '{domain_id}' not found for chapter '{chapter_id}'")
+    
+    return _domain_word_response(doc)
+
+# ---------------------- SEARCH DOMAIN WORDS ---------------------- #
+@router.get("/domain-words/search")
+async def search_domain_words(q: str, chapter_id: str = None, limit: int = 50, langs: list | None = Depends(parse_langs)):
+    """Case-insensitive substring search over word names and definitions"""
+    if not q or not 1 <= limit <= 500:
+        raise HTTPException(status_code=400, detail="q must not be empty and limit must be between 1 and 500")
+    snapshot = await word_snapshot.current_snapshot()
+    if snapshot:
+        matches = [_project_translations(word, langs) for word in snapshot.search(q, chapter_id, limit)]
+        return {"domain_words": matches, "count": len(matches)}
+    
+    pattern = {"$regex": re.escape(q), "$options": "i"}
+    query = {"$or": [{"name": pattern}, {"definition": pattern}]}
+    if chapter_id:
+        query["chapter_id"] = chapter_id
+    matches = [_domain_word_response(doc) async for doc in collection(DOMAIN_WORDS).find(query, word_projection(langs)).limit(limit)]
+    return {"domain_words": matches, "count": len(matches)}
+
+# ---------------------- BATCH GET DOMAIN WORDS ---------------------- #
+@router.post("/domain-words/batch-get")
+async def batch_get_domain_words(data: BatchGetRequest, langs: list | None = Depends(parse_langs)):
+    """Fetch many words in one round trip; results follow request order, misses are explicit"""
+    docs = await batch_get(collection(DOMAIN_WORDS), data.keys, word_projection(langs))
+    results = [{
+        "chapter_id": key.chapter_id,
+        "domain_id": key.domain_id,
+        "found": doc is not None,
+        "domain_word": _domain_word_response(doc) if doc else None
+    } for key, doc in zip(data.keys, docs)]
+    found = sum(result["found"] for result in results)
+    return {"results": results, "found": found, "missing": len(results) - found}
+
+# ---------------------- EXPORT TRANSLATIONS FOR ONE LANGUAGE ---------------------- #
+async def _stream_translations(lang: str, chapter_id: str = None):
+    query = {f"translations.{lang}": {"$exists": True}}
+    if chapter_id:
+        query["chapter_id"] = chapter_id
+    cursor = collection(DOMAIN_WORDS).find(query, {"_id": 0, "name": 1, f"translations.{lang}": 1})
+    yield f'{{"lang": {json.dumps(lang)}, "translations": ['
+    first = True
+    async for doc in cursor.batch_size(1000):
+        pair = json.dumps({"name": doc.get("name", ""), "translation": doc["translations"][lang]}, ensure_ascii=False)
+        yield pair if first else "," + pair
+        first = False
+    yield "]}"
+
+@router.get("/translations/{lang}")
+async def export_translations(lang: str, chapter_id: str = None):
+    """Stream name -> translation pairs for one language (uses the translations wildcard index)"""
+    if not LANG_PATTERN.match(lang):
+        raise HTTPException(status_code=400, detail=f"Invalid language code '{lang}'")
+    return StreamingResponse(_stream_translations(lang, chapter_id), media_type="application/json")
+
+# ---------------------- UPDATE DOMAIN WORD ---------------------- #
+@router.put("/domain-words/{chapter_id}/{domain_id}")
+async def update_domain_word(chapter_id: str, domain_id: str, data: DomainWordUpdateRequest, expected_version: int | None = Depends(get_expected_version)):
+    try:
+        # DEBUG: Log the incoming request
+        print(f"🔍 DEBUG - Update Domain Word Request:")
+        print(f"📁 Chapter ID: {chapter_id}")
+        print(f"📝 Domain ID: {domain_id}")
+        print(f"📦 Received data: {data.dict()}")
+        print("=" * 60)
+        
+        key = {"chapter_id": chapter_id, "domain_id": domain_id}
+        not_found_detail = f"Domain word '{domain_id}' not found for chapter '{chapter_id}'"
+        
+        # Build update fields dynamically - only include fields that are provided
+        update_fields = {}
+        if data.definition is not None:
+            update_fields["definition"] = data.definition
+        if data.translations is not None:
+            update_fields["translations"] = data.translations
+        if data.word_structure is not None:
+            update_fields["word_structure"] = data.word_structure
+        if data.domain_id is not None:
+            update_fields["domain_id"] = data.domain_id
+        if data.name is not None:
+            update_fields["name"] = data.name
+        if data.is_mwe is not None:
+            update_fields["is_mwe"] = data.is_mwe
+        if data.mwe_type is not None:
+            update_fields["mwe_type"] = data.mwe_type
+        
+        # If no fields to update, return early
+        if not update_fields:
+            current = await diagnose_failed_update(collection(DOMAIN_WORDS), key, expected_version, not_found_detail)
+            return JSONResponse(content={
+                "message": "No fields to update",
+                "domain_id": domain_id,
+                "chapter_id": chapter_id,
+                "version": current.get("version", 0)
+            })
+        
+        # DEBUG: Log what we're updating
+        print(f"🔄 Updating fields: {list(update_fields.keys())}")
+        
+        # Perform the update only if nobody changed the word since the client read it
+        try:
+            updated = await collection(DOMAIN_WORDS).find_one_and_update(
+                {**key, **version_filter(expected_version)},
+                {"$set": {**update_fields, "updated_at": utc_now()}, "$inc": {"version": 1}},
+                projection={"version": 1},
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Renamed onto a key the unique (chapter_id, domain_id) index already holds
+            raise HTTPException(status_code=409, detail=f"Domain word '{data.domain_id}' already exists for chapter '{chapter_id}'")
+        if not updated:
+            await diagnose_failed_update(collection(DOMAIN_WORDS), key, expected_version, not_found_detail)
+            raise HTTPException(status_code=409, detail="Domain word was modified concurrently, please reload and retry")
+        
+        if data.domain_id is not None and data.domain_id != domain_id:
+            # Renamed: the old key no longer exists for delta sync clients
+            await record_tombstone(DOMAIN_WORDS, key)
+        
+        print(f"✅ Domain word '{domain_id}' updated successfully")
+        await word_snapshot.notify_write()
+        log_activity("edited", "Domain Words", f"Updated fields {list(update_fields.keys())} of '{domain_id}'", chapter_id, domain_id)
+        return JSONResponse(content={
+            "message": f"Domain word updated successfully",
+            "updated_fields": list(update_fields.keys()),
+            "domain_id": data.domain_id or domain_id,  # Return new domain_id if changed
+            "chapter_id": chapter_id,
+            "version": updated["version"]
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error updating domain word: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error updating domain word: {str(e)}")
+
+# ---------------------- CREATE DOMAIN WORD ---------------------- #
+@router.post("/domain-words/{chapter_id}/{domain_id}")
+async def create_domain_word(chapter_id: str, domain_id: str, data: DomainWordCreateRequest):
+    # Create new domain word document; the unique (chapter_id, domain_id) index rejects duplicates
+    try:
+        await collection(DOMAIN_WORDS).insert_one({
+            "chapter_id": chapter_id,
+            "domain_id": domain_id,
+            "definition": data.definition,
+            "translations": data.translations,
+            "word_structure": data.word_structure,
+            "is_mwe": data.is_mwe,
+            "mwe_type": data.mwe_type,
+            "name": data.name,
+            "tokens_with_pos": data.tokens_with_pos,
+            "audio_binary": None,  # You can add audio handling later
+            "version": 0,
+            "updated_at": utc_now()
+        })
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail=f"Domain word '{domain_id}' already exists for chapter '{chapter_id}'")
+    await word_snapshot.notify_write()
+    log_activity("created", "Domain Words", f"Created domain word '{data.name}'", chapter_id, domain_id)
+    
+    return JSONResponse(content={
+        "message": f"Domain word '{domain_id}' created successfully",
+        "domain_id": domain_id,
+        "chapter_id": chapter_id
+    }, status_code=201)
+
+# ---------------------- UPSERT DOMAIN WORD ---------------------- #
+@router.put("/domain-words/upsert/{chapter_id}/{domain_id}")
+async def upsert_domain_word(chapter_id: str, domain_id: str, data: DomainWordCreateRequest):
+    """Idempotent create-or-replace for ingestion pipelines"""
+    doc = await upsert_document(
+        collection(DOMAIN_WORDS),
+        {"chapter_id": chapter_id, "domain_id": domain_id},
+        {
+            "$set": {
+                "definition": data.definition,
+                "translations": data.translations,
+                "word_structure": data.word_structure,
+                "is_mwe": data.is_mwe,
+                "mwe_type": data.mwe_type,
+                "name": data.name,
+                "tokens_with_pos": data.tokens_with_pos,
+                "updated_at": utc_now()
+            },
+            "$setOnInsert": {"audio_binary": None},
+            "$inc": {"version": 1}
+        },
+        projection={"version": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    await word_snapshot.notify_write()
+    log_activity("upserted", "Domain Words", f"Upserted domain word '{data.name}'", chapter_id, domain_id)
+    
+    return JSONResponse(content={
+        "message": f"Domain word '{domain_id}' {'created' if doc is None else 'updated'} successfully",
+        "domain_id": domain_id,
+        "chapter_id": chapter_id,
+        "created": doc is None,
+        "version": 1 if doc is None else doc.get("version", 0) + 1
+    }, status_code=201 if doc is None else 200)
+
+# ---------------------- DELETE DOMAIN WORD ---------------------- #
+@router.delete("/domain-words/{chapter_id}/{domain_id}")
+async def delete_domain_word(chapter_id: str, domain_id: str, expected_version: int | None = Depends(get_expected_version)):
+    key = {"chapter_id": chapter_id, "domain_id": domain_id}
+    deleted = await collection(DOMAIN_WORDS).find_one_and_delete(
+        {**key, **version_filter(expected_version)},
+        projection={"audio": 1}
+    )
+    
+    if deleted is None:
+        await diagnose_failed_update(collection(DOMAIN_WORDS), key, expected_version, f"Domain word '{domain_id}' not found for chapter '{chapter_id}'")
+        raise HTTPException(status_code=409, detail="Domain word was modified concurrently, please reload and retry")
+    await record_tombstone(DOMAIN_WORDS, key)
+    if deleted.get("audio"):
+        await delete_audio_files(deleted["audio"])
+    await word_snapshot.notify_write()
+    log_activity("deleted", "Domain Words", f"Deleted domain word '{domain_id}'", chapter_id, domain_id)
+    
+    return JSONResponse(content={
+        "message": f"Domain word '{domain_id}' deleted successfully",
+        "domain_id": domain_id,
+        "chapter_id": chapter_id
+    })
@@ -0,0 +1,206 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import re
+
+from api.activity import log_activity
+from api.concurrency import (
+    NEXT_VERSION, diagnose_failed_update, get_expected_version, upsert_document, version_filter
+)
+from api.db import SECTION_SUMMARY, collection
+from api.revisions import list_summary_revisions, load_summary_revision, record_summary_revision
+from api.sync import changed_since, get_since, new_watermark, sync_fields, utc_now
+
+router = APIRouter(tags=["section summary"])
+
+# ---------------------- Pydantic Models ---------------------- #
+class SectionEditRequest(BaseModel):
+    replace_text: str
+    with_text: str
+
+class SectionReplaceRequest(BaseModel):
+    section_summary: str
+
+# ====================== SECTION SUMMARY ENDPOINTS ====================== #
+
+# ---------------------- GET ALL SECTIONS ---------------------- #
+@router.get("/all-sections")
+async def get_all_sections(since: datetime | None = Depends(get_since)):
+    try:
+        watermark = new_watermark()
+        sections = []
+        async for doc in collection(SECTION_SUMMARY).find(changed_since(since)):
+            sections.append({
+                "chapter_id": doc["chapter_id"],
+                "section_id": doc["section_id"],
+                "section_summary": doc["section_summary"],
+                "version": doc.get("version", 0)
+            })
+        return {"sections": sections, **await sync_fields(SECTION_SUMMARY, since, watermark, sections, ("chapter_id", "section_id"))}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching sections: {str(e)}")
+
+# ---------------------- GET SECTION SUMMARY ---------------------- #
+@router.get("/section-summary/{chapter_id}/{section_id}")
+async def get_section_summary(chapter_id: str, section_id: str):
+    doc = await collection(SECTION_SUMMARY).find_one({
+        "chapter_id": chapter_id,
+        "section_id": section_id
+    })
+    if not doc:
+        raise HTTPException(status_code=404, detail=f"Section '{section_id}' not found for chapter '{chapter_id}'")
+    return {"section_summary": doc["section_summary"], "version": doc.get("version", 0)}
+
+# ---------------------- BULK REPLACE SECTION SUMMARY ---------------------- #
+@router.put("/section-summary/replace/{chapter_id}/{section_id}")
+async def replace_section_summary(chapter_id: str, section_id: str, data: SectionReplaceRequest, expected_version: int | None = Depends(get_expected_version)):
+    key = {"chapter_id": chapter_id, "section_id": section_id}
+    doc = await collection(SECTION_SUMMARY).find_one_and_update(
+        {**key, **version_filter(expected_version)},
+        {"$set": {"section_summary": data.section_summary, "updated_at": utc_now()}, "$inc": {"version": 1}},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not doc:
+        await diagnose_failed_update(collection(SECTION_SUMMARY), key, expected_version, f"Section '{section_id}' not found for chapter '{chapter_id}'")
+        raise HTTPException(status_code=409, detail="Section summary was modified concurrently, please reload and retry")
+    
+    version = await record_summary_revision("section_summary", chapter_id, section_id, doc, data.section_summary)
+    log_activity("replaced", "Section Summary", f"Replaced section summary '{section_id}'", chapter_id, section_id)
+    return JSONResponse(content={
+        "message": f"Section summary for '{section_id}' in chapter '{chapter_id}' updated successfully",
+        "section_id": section_id,
+        "chapter_id": chapter_id,
+        "version": version
+    })
+
+# ---------------------- PARTIAL EDIT SECTION SUMMARY ---------------------- #
+@router.put("/section-summary/{chapter_id}/{section_id}")
+async def partial_edit_section_summary(chapter_id: str, section_id: str, data: SectionEditRequest, expected_version: int | None = Depends(get_expected_version)):
+    if not data.replace_text:
+        raise HTTPException(status_code=400, detail="replace_text must not be empty")
+    key = {"chapter_id": chapter_id, "section_id": section_id}
+    doc = await collection(SECTION_SUMMARY).find_one_and_update(
+        {
+            **key,
+            "section_summary": {"$regex": re.escape(data.replace_text)},
+            **version_filter(expected_version)
+        },
+        [{"$set": {
+            "section_summary": {"$replaceAll": {
+                "input": "$section_summary",
+                "find": data.replace_text,
+                "replacement": data.with_text
+            }},
+            "version": NEXT_VERSION,
+            "updated_at": utc_now()
+        }}],
+        return_document=ReturnDocument.BEFORE
+    )
+    if not doc:
+        current = await diagnose_failed_update(collection(SECTION_SUMMARY), key, expected_version, f"Section '{section_id}' not found for chapter '{chapter_id}'")
+        if data.replace_text not in current["section_summary"]:
+            raise HTTPException(status_code=400, detail=f"'{data.replace_text}' not found in section summary")
+        raise HTTPException(status_code=409, detail="Section summary was modified concurrently, please reload and retry")
+    
+    new_section_text = doc["section_summary"].replace(data.replace_text, data.with_text)
+    version = await record_summary_revision("section_summary", chapter_id, section_id, doc, new_section_text)
+    log_activity("edited", "Section Summary", f"Edited section '{section_id}': '{data.replace_text}' -> '{data.with_text}'", chapter_id, section_id)
+    return JSONResponse(content={
+        "message": f"Section summary for '{section_id}' partially edited successfully",
+        "old_text": data.replace_text,
+        "new_text": data.with_text,
+        "section_id": section_id,
+        "chapter_id": chapter_id,
+        "version": version
+    })
+
+# ---------------------- DELETE SECTION SUMMARY ---------------------- #
+@router.delete("/section-summary/{chapter_id}/{section_id}")
+async def delete_section_summary(chapter_id: str, section_id: str, expected_version: int | None = Depends(get_expected_version)):
+    key = {"chapter_id": chapter_id, "section_id": section_id}
+    # Instead of deleting the document, we'll clear the section_summary field
+    doc = await collection(SECTION_SUMMARY).find_one_and_update(
+        {**key, **version_filter(expected_version)},
+        {"$set": {"section_summary": "", "updated_at": utc_now()}, "$inc": {"version": 1}},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not doc:
+        await diagnose_failed_update(collection(SECTION_SUMMARY), key, expected_version, f"Section '{section_id}' not found for chapter '{chapter_id}'")
+        raise HTTPException(status_code=409, detail="Section summary was modified concurrently, please reload and retry")
+    
+    version = await record_summary_revision("section_summary", chapter_id, section_id, doc, "")
+    log_activity("deleted", "Section Summary", f"Cleared section summary '{section_id}'", chapter_id, section_id)
+    return JSONResponse(content={
+        "message": f"Section summary for '{section_id}' in chapter '{chapter_id}' cleared successfully",
+        "section_id": section_id,
+        "chapter_id": chapter_id,
+        "version": version
+    })
+
+# ---------------------- CREATE SECTION SUMMARY ---------------------- #
+@router.post("/section-summary/{chapter_id}/{section_id}")
+async def create_section_summary(chapter_id: str, section_id: str, data: SectionReplaceRequest):
+    # Create new section document (version 0 is the initial revision snapshot);
+    # the unique (chapter_id, section_id) index rejects duplicates
+    try:
+        await collection(SECTION_SUMMARY).insert_one({
+            "chapter_id": chapter_id,
+            "section_id": section_id,
+            "section_summary": data.section_summary,
+            "version": 0,
+            "updated_at": utc_now()
+        })
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail=f"Section '{section_id}' already exists for chapter '{chapter_id}'")
+    await record_summary_revision("section_summary", chapter_id, section_id, None, data.section_summary)
+    log_activity("created", "Section Summary", f"Created section summary '{section_id}'", chapter_id, section_id)
+    
+    return JSONResponse(content={
+        "message": f"Section summary for '{section_id}' in chapter '{chapter_id}' created successfully",
+        "section_id": section_id,
+        "chapter_id": chapter_id
+    }, status_code=201)
+
+# ---------------------- UPSERT SECTION SUMMARY ---------------------- #
+@router.put("/section-summary/upsert/{chapter_id}/{section_id}")
+async def upsert_section_summary(chapter_id: str, section_id: str, data: SectionReplaceRequest):
+    """Idempotent create-or-replace for ingestion pipelines"""
+    key = {"chapter_id": chapter_id, "section_id": section_id}
+    doc = await upsert_document(
+        collection(SECTION_SUMMARY), key,
+        {"$set": {"section_summary": data.section_summary, "updated_at": utc_now()}, "$inc": {"version": 1}},
+        return_document=ReturnDocument.BEFORE
+    )
+    if doc is None:
+        # Inserted: $inc started the version at 1, so that is the first snapshot
+        version = await record_summary_revision("section_summary", chapter_id, section_id, None, data.section_summary, initial_revision=1)
+    else:
+        version = await record_summary_revision("section_summary", chapter_id, section_id, doc, data.section_summary)
+    log_activity("upserted", "Section Summary", f"Upserted section summary '{section_id}'", chapter_id, section_id)
+    
+    return JSONResponse(content={
+        "message": f"Section summary for '{section_id}' in chapter '{chapter_id}' {'created' if doc is None else 'updated'} successfully",
+        "section_id": section_id,
+        "chapter_id": chapter_id,
+        "created": doc is None,
+        "version": version
+    }, status_code=201 if doc is None else 200)
+
+# ---------------------- LIST SECTION SUMMARY REVISIONS ---------------------- #
+@router.get("/section-summary/revisions/{chapter_id}/{section_id}")
+async def get_section_summary_revisions(chapter_id: str, section_id: str, limit: int = 50):
+    revisions = await list_summary_revisions("section_summary", chapter_id, section_id, limit)
+    if not revisions:
+        raise HTTPException(status_code=404, detail=f"No revisions found for section '{section_id}' in chapter '{chapter_id}'")
+    return {"chapter_id": chapter_id, "section_id": section_id, "revisions": revisions}
+
+# ---------------------- GET SECTION SUMMARY REVISION ---------------------- #
+@router.get("/section-summary/revisions/{chapter_id}/{section_id}/{revision}")
+async def get_section_summary_revision(chapter_id: str, section_id: str, revision: int):
+    content = await load_summary_revision("section_summary", chapter_id, section_id, revision)
+    if content is None:
+        raise HTTPException(status_code=404, detail=f"Revision {revision} not found for section '{section_id}' in chapter '{chapter_id}'")
+    return {"chapter_id": chapter_id, "section_id": section_id, "revision": revision, "section_summary": content}
@@ -0,0 +1,258 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+from typing import List
+import re
+
+from api.activity import log_activity
+from api.concurrency import (
+    NEXT_VERSION, diagnose_failed_update, get_expected_version, splice_sentences, version_filter
+)
+from api.db import FULL_SUMMARY, collection
+from api.revisions import list_summary_revisions, load_summary_revision, record_summary_revision
+from api.sentence_store import (
+    ARRAY_STORAGE, NOT_SENTENCE_STORAGE, SENTENCE_STORAGE, convert_storage, delete_sentence,
+    edit_sentence, load_sentences, replace_sentences, uses_sentence_storage
+)
+from api.sync import changed_since, get_since, new_watermark, sync_fields, utc_now
+
+router = APIRouter(tags=["full summary"])
+
+# ---------------------- Pydantic Models ---------------------- #
+class EditRequest(BaseModel):
+    index: int
+    replace_text: str
+    with_text: str
+
+class SummaryRequest(BaseModel):
+    index: int
+    sentence: str | None = None
+
+class ReplaceRequest(BaseModel):
+    sentences: List[str]
+
+class StorageRequest(BaseModel):
+    mode: str  # "array" or "sentences"
+
+# ---------------------- SUMMARY PROJECTIONS ---------------------- #
+MAX_SENTENCE_RANGE = 1000
+SUMMARY_MODES = ("full", "none", "count", "head")
+SENTENCE_COUNT = {"$size": {"$ifNull": ["$full_summary", []]}}
+
+def _sentence_slice(offset: int, limit: int | None):
+    """full_summary projection for `limit` sentences from `offset`. find() takes the
+    $slice projection operator ({"$slice": n} or [skip, n]), not the aggregation form."""
+    if offset == 0 and limit:
+        return {"$slice": limit}
+    return {"$slice": [offset, limit or 2**31 - 1]}
+
+def _chapter_projection(summary: str, head_size: int):
+    """/all-chapters projection; `none`, `count` and `head` never ship whole arrays"""
+    projection = {"_id": 0, "chapter_id": 1, "version": 1}
+    if summary == "none":
+        return projection
+    projection.update({"storage": 1, "sentence_count": 1})
+    if summary == "full":
+        projection["full_summary"] = 1
+        return projection
+    projection["total_sentences"] = SENTENCE_COUNT
+    if summary == "head":
+        projection["full_summary"] = _sentence_slice(0, head_size)
+    return projection
+
+# ====================== FULL SUMMARY ENDPOINTS ====================== #
+
+# ---------------------- GET ALL CHAPTERS ---------------------- #
+@router.get("/all-chapters")
+async def get_all_chapters(since: datetime | None = Depends(get_since), summary: str = "full", head_size: int = 3):
+    """summary=full (default) returns every sentence, none only ids and versions,
+    count adds sentence_count, head the first head_size sentences plus the count"""
+    if summary not in SUMMARY_MODES:
+        raise HTTPException(status_code=400, detail=f"summary must be one of {list(SUMMARY_MODES)}")
+    if not 1 <= head_size <= MAX_SENTENCE_RANGE:
+        raise HTTPException(status_code=400, detail=f"head_size must be between 1 and {MAX_SENTENCE_RANGE}")
+    try:
+        watermark = new_watermark()
+        chapters = []
+        async for doc in collection(FULL_SUMMARY).find(changed_since(since), _chapter_projection(summary, head_size)):
+            chapter = {"chapter_id": doc["chapter_id"], "version": doc.get("version", 0)}
+            sentence_storage = uses_sentence_storage(doc)
+            if summary == "full":
+                chapter["full_summary"] = await load_sentences(doc["chapter_id"]) if sentence_storage else doc["full_summary"]
+            elif summary == "head":
+                chapter["full_summary"] = await load_sentences(doc["chapter_id"], 0, head_size) if sentence_storage else doc.get("full_summary") or []
+            if summary in ("count", "head"):
+                chapter["sentence_count"] = doc.get("sentence_count", 0) if sentence_storage else doc["total_sentences"]
+            chapters.append(chapter)
+        return {"chapters": chapters, **await sync_fields(FULL_SUMMARY, since, watermark, chapters, ("chapter_id",))}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching chapters: {str(e)}")
+
+# ---------------------- GET FULL SUMMARY ---------------------- #
+@router.get("/full-summary/{chapter_id}")
+async def get_full_summary(chapter_id: str, offset: int = 0, limit: int | None = None):
+    """All sentences, or `limit` sentences from `offset` (a $slice projection, or a
+    position range for chapters in sentence storage)"""
+    if offset < 0 or (limit is not None and not 1 <= limit <= MAX_SENTENCE_RANGE):
+        raise HTTPException(status_code=400, detail=f"offset must be >= 0 and limit between 1 and {MAX_SENTENCE_RANGE}")
+    ranged = offset > 0 or limit is not None
+    projection = {"version": 1, "storage": 1, "sentence_count": 1, "total_sentences": SENTENCE_COUNT}
+    projection["full_summary"] = _sentence_slice(offset, limit) if ranged else 1
+    doc = await collection(FULL_SUMMARY).find_one({"chapter_id": chapter_id}, projection)
+    if not doc:
+        raise HTTPException(status_code=404, detail=f"Chapter '{chapter_id}' not found")
+    if uses_sentence_storage(doc):
+        sentences = await load_sentences(chapter_id, offset, limit)
+        total = doc.get("sentence_count", 0)
+    else:
+        sentences, total = doc.get("full_summary") or [], doc["total_sentences"]
+    return {"full_summary": sentences, "version": doc.get("version", 0), "offset": offset, "total_sentences": total}
+
+# ---------------------- BULK REPLACE SUMMARY ---------------------- #
+@router.put("/full-summary/replace/{chapter_id}")
+async def replace_full_summary(chapter_id: str, data: ReplaceRequest, expected_version: int | None = Depends(get_expected_version)):
+    doc = await collection(FULL_SUMMARY).find_one_and_update(
+        {"chapter_id": chapter_id, **NOT_SENTENCE_STORAGE, **version_filter(expected_version)},
+        {"$set": {"full_summary": data.sentences, "updated_at": utc_now()}, "$inc": {"version": 1}},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not doc:
+        current = await diagnose_failed_update(collection(FULL_SUMMARY), {"chapter_id": chapter_id}, expected_version, f"Chapter '{chapter_id}' not found")
+        if not uses_sentence_storage(current):
+            raise HTTPException(status_code=409, detail="Summary was modified concurrently, please reload and retry")
+        doc = await replace_sentences(chapter_id, current, data.sentences)
+
+    version = await record_summary_revision("full_summary", chapter_id, None, doc, data.sentences)
+    log_activity("replaced", "Full Summary", f"Replaced full summary ({len(data.sentences)} sentences)", chapter_id)
+    return JSONResponse(content={
+        "message": f"Full summary for chapter '{chapter_id}' updated successfully",
+        "new_sentences_count": len(data.sentences),
+        "version": version
+    })
+
+# ---------------------- PARTIAL EDIT ---------------------- #
+@router.put("/full-summary/{chapter_id}")
+async def partial_edit_summary(chapter_id: str, data: EditRequest, expected_version: int | None = Depends(get_expected_version)):
+    if data.index < 0:
+        raise HTTPException(status_code=400, detail="Invalid index number")
+    if not data.replace_text:
+        raise HTTPException(status_code=400, detail="replace_text must not be empty")
+    # Replace inside the one sentence on the server; the filter only matches
+    # when the sentence exists and contains replace_text
+    edited_sentence = {"$replaceAll": {
+        "input": {"$arrayElemAt": ["$full_summary", data.index]},
+        "find": data.replace_text,
+        "replacement": data.with_text
+    }}
+    doc = await collection(FULL_SUMMARY).find_one_and_update(
+        {
+            "chapter_id": chapter_id,
+            **NOT_SENTENCE_STORAGE,
+            f"full_summary.{data.index}": {"$regex": re.escape(data.replace_text)},
+            **version_filter(expected_version)
+        },
+        [{"$set": {
+            "full_summary": splice_sentences(data.index, [edited_sentence]),
+            "version": NEXT_VERSION,
+            "updated_at": utc_now()
+        }}],
+        return_document=ReturnDocument.BEFORE
+    )
+    if doc:
+        sentence = doc["full_summary"][data.index]
+        new_sentence = sentence.replace(data.replace_text, data.with_text)
+    else:
+        current = await diagnose_failed_update(collection(FULL_SUMMARY), {"chapter_id": chapter_id}, expected_version, f"Chapter '{chapter_id}' not found")
+        if uses_sentence_storage(current):
+            sentence, new_sentence, doc = await edit_sentence(chapter_id, current, data.index, data.replace_text, data.with_text)
+        else:
+            if data.index >= len(current["full_summary"]):
+                raise HTTPException(status_code=400, detail="Invalid index number")
+            if data.replace_text not in current["full_summary"][data.index]:
+                raise HTTPException(status_code=400, detail=f"'{data.replace_text}' not found in sentence")
+            raise HTTPException(status_code=409, detail="Summary was modified concurrently, please reload and retry")
+
+    version = await record_summary_revision(
+        "full_summary", chapter_id, None, doc, None,
+        delta=[[data.index, data.index + 1, [new_sentence]]]
+    )
+    log_activity("edited", "Full Summary", f"Edited sentence {data.index}: '{data.replace_text}' -> '{data.with_text}'", chapter_id)
+    return JSONResponse(content={
+        "message": f"Sentence at index {data.index} partially edited successfully",
+        "old_sentence": sentence,
+        "new_sentence": new_sentence,
+        "version": version
+    })
+
+# ---------------------- DELETE ---------------------- #
+@router.delete("/full-summary/{chapter_id}")
+async def delete_summary_sentence(chapter_id: str, data: SummaryRequest, expected_version: int | None = Depends(get_expected_version)):
+    if data.index < 0:
+        raise HTTPException(status_code=400, detail="Invalid index number")
+    doc = await collection(FULL_SUMMARY).find_one_and_update(
+        {
+            "chapter_id": chapter_id,
+            **NOT_SENTENCE_STORAGE,
+            f"full_summary.{data.index}": {"$exists": True},
+            **version_filter(expected_version)
+        },
+        [{"$set": {
+            "full_summary": splice_sentences(data.index, []),
+            "version": NEXT_VERSION,
+            "updated_at": utc_now()
+        }}],
+        return_document=ReturnDocument.BEFORE
+    )
+    if doc:
+        removed_sentence = doc["full_summary"][data.index]
+    else:
+        current = await diagnose_failed_update(collection(FULL_SUMMARY), {"chapter_id": chapter_id}, expected_version, f"Chapter '{chapter_id}' not found")
+        if uses_sentence_storage(current):
+            removed_sentence, doc = await delete_sentence(chapter_id, current, data.index)
+        else:
+            if data.index >= len(current["full_summary"]):
+                raise HTTPException(status_code=400, detail="Invalid index number")
+            raise HTTPException(status_code=409, detail="Summary was modified concurrently, please reload and retry")
+
+    version = await record_summary_revision(
+        "full_summary", chapter_id, None, doc, None,
+        delta=[[data.index, data.index + 1, []]]
+    )
+    log_activity("deleted", "Full Summary", f"Deleted sentence {data.index}", chapter_id)
+    return JSONResponse(content={
+        "message": f"Sentence at index {data.index} deleted successfully",
+        "deleted_sentence": removed_sentence,
+        "version": version
+    })
+
+# ---------------------- STORAGE MODE ---------------------- #
+@router.put("/full-summary/storage/{chapter_id}")
+async def set_summary_storage(chapter_id: str, data: StorageRequest):
+    """Switch a chapter between one array ("array") and one document per sentence ("sentences")"""
+    if data.mode not in (ARRAY_STORAGE, SENTENCE_STORAGE):
+        raise HTTPException(status_code=400, detail=f"mode must be '{ARRAY_STORAGE}' or '{SENTENCE_STORAGE}'")
+    sentence_count = await convert_storage(chapter_id, data.mode)
+    log_activity("updated", "Full Summary", f"Switched full summary to {data.mode} storage", chapter_id)
+    return JSONResponse(content={
+        "message": f"Full summary for chapter '{chapter_id}' uses {data.mode} storage",
+        "storage": data.mode,
+        "sentence_count": sentence_count
+    })
+
+# ---------------------- LIST FULL SUMMARY REVISIONS ---------------------- #
+@router.get("/full-summary/revisions/{chapter_id}")
+async def get_full_summary_revisions(chapter_id: str, limit: int = 50):
+    revisions = await list_summary_revisions("full_summary", chapter_id, None, limit)
+    if not revisions:
+        raise HTTPException(status_code=404, detail=f"No revisions found for chapter '{chapter_id}'")
+    return {"chapter_id": chapter_id, "revisions": revisions}
+
+# ---------------------- GET FULL SUMMARY REVISION ---------------------- #
+@router.get("/full-summary/revisions/{chapter_id}/{revision}")
+async def get_full_summary_revision(chapter_id: str, revision: int):
+    content = await load_summary_revision("full_summary", chapter_id, None, revision)
+    if content is None:
+        raise HTTPException(status_code=404, detail=f"Revision {revision} not found for chapter '{chapter_id}'")
+    return {"chapter_id": chapter_id, "revision": revision, "full_summary": content}
@@ -0,0 +1,443 @@
+from bson import ObjectId
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import base64
+
+from api.activity import log_activity
+from api.batch import BatchGetRequest, batch_get
+from api.coalesce import single_flight
+from api.concurrency import diagnose_failed_update, get_expected_version, upsert_document, version_filter
+from api.db import TAXONOMY, collection
+from api.image_blobs import acquire_image, load_image, release_image
+from api.sync import changed_since, get_since, new_watermark, record_tombstone, sync_fields, utc_now
+
+router = APIRouter(tags=["taxonomy"])
+
+# ====================== TAXONOMY ENDPOINTS ====================== #
+
+# ---------------------- PYDANTIC MODELS FOR TAXONOMY ---------------------- #
+class TaxonomyUpdateRequest(BaseModel):
+    domain_name: str
+    image_format: str
+
+class TaxonomyCreateRequest(BaseModel):
+    chapter_id: str
+    domain_id: str
+    domain_name: str
+    image_format: str
+    taxonomy_image: str  # Base64 encoded image data
+
+# Metadata only; the image bytes are fetched separately via image_url
+TAXONOMY_PROJECTION = {"chapter_id": 1, "domain_id": 1, "domain_name": 1, "image_format": 1, "version": 1}
+
+def _taxonomy_response(doc):
+    # Convert ObjectId to string and include image URL
+    return {
+        "_id": str(doc["_id"]),
+        "chapter_id": doc.get("chapter_id", ""),
+        "domain_id": doc.get("domain_id", ""),
+        "domain_name": doc.get("domain_name", ""),
+        "image_format": doc.get("image_format", ""),
+        "image_url": f"/taxonomy/image/{str(doc['_id'])}",
+        "image_url_base64": f"/taxonomy/image-base64/{str(doc['_id'])}",  # Alternative endpoint
+        "version": doc.get("version", 0)
+    }
+
+# ---------------------- GET ALL TAXONOMIES ---------------------- #
+@router.get("/all-taxonomies")
+async def get_all_taxonomies(since: datetime | None = Depends(get_since)):
+    # Identical concurrent listings share one query and one encoded body
+    body = await single_flight(("/all-taxonomies", since), lambda: _encode_all_taxonomies(since))
+    return Response(content=body, media_type="application/json")
+
+async def _encode_all_taxonomies(since):
+    return JSONResponse(content=jsonable_encoder(await _all_taxonomies(since))).body
+
+async def _all_taxonomies(since):
+    try:
+        watermark = new_watermark()
+        taxonomies = []
+        async for doc in collection(TAXONOMY).find(changed_since(since), TAXONOMY_PROJECTION):
+            # Convert ObjectId to string and include image URL
+            taxonomy = {
+                "_id": str(doc["_id"]),
+                "chapter_id": doc.get("chapter_id", ""),
+                "domain_id": doc.get("domain_id", ""),
+                "domain_name": doc.get("domain_name", ""),
+                "image_format": doc.get("image_format", ""),
+                "image_url": f"/taxonomy/image/{str(doc['_id'])}",
+                "version": doc.get("version", 0)
+            }
+            taxonomies.append(taxonomy)
+        return {"taxonomies": taxonomies, **await sync_fields(TAXONOMY, since, watermark, taxonomies, ("chapter_id", "domain_id"))}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching taxonomies: {str(e)}")
+
+# ---------------------- GET TAXONOMY IMAGE ---------------------- #
+# # ---------------------- GET TAXONOMY IMAGE ---------------------- #
+@router.get("/taxonomy/image/{taxonomy_id}")
+async def get_taxonomy_image(taxonomy_id: str):
+    # Concurrent requests for the same image share one fetch
+    taxonomy_image, content_type = await single_flight(
+        ("/taxonomy/image", taxonomy_id), lambda: _load_taxonomy_image(taxonomy_id)
+    )
+    
+    # FIX: Remove filename from Content-Disposition to prevent downloads
+    # Return the binary image data
+    return Response(
+        content=taxonomy_image,
+        media_type=content_type,
+        headers={
+            "Content-Disposition": "inline",  # FIX: Changed from download to inline
+            "Cache-Control": "no-cache, no-store, must-revalidate"
+        }
+    )
+
+async def _load_taxonomy_image(taxonomy_id: str):
+    try:
+        # Convert string ID to ObjectId
+        doc = await collection(TAXONOMY).find_one({"_id": ObjectId(taxonomy_id)}, {"image_hash": 1, "taxonomy_image": 1, "image_format": 1})
+        
+        if not doc:
+            raise HTTPException(status_code=404, detail="Taxonomy image not found")
+        
+        taxonomy_image = await load_image(doc)
+        print(f"DEBUG: Image data type: {type(taxonomy_image)}")
+        print(f"DEBUG: Image data length: {len(taxonomy_image) if taxonomy_image else 0}")
+        
+        if not taxonomy_image:
+            raise HTTPException(status_code=404, detail="Image data not found")
+        
+        image_format = doc.get("image_format", "svg").lower()
+        
+        # FIX: Proper content types for different formats
+        content_types = {
+            "svg": "image/svg+xml",
+            "png": "image/png", 
+            "jpg": "image/jpeg",
+            "jpeg": "image/jpeg",
+            "gif": "image/gif",
+            "webp": "image/webp"
+        }
+        
+        content_type = content_types.get(image_format, "application/octet-stream")
+        return taxonomy_image, content_type
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"DEBUG: Error in get_taxonomy_image: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error fetching taxonomy image: {str(e)}")
+    
+# ---------------------- GET TAXONOMY IMAGE (Alternative Method) ---------------------- #
+@router.get("/taxonomy/image-base64/{taxonomy_id}")
+async def get_taxonomy_image_base64(taxonomy_id: str):
+    """Alternative endpoint that returns base64 encoded image"""
+    try:
+        doc = await collection(TAXONOMY).find_one({"_id": ObjectId(taxonomy_id)})
+        
+        if not doc:
+            raise HTTPException(status_code=404, detail="Taxonomy image not found")
+        
+        taxonomy_image = await load_image(doc)
+        if not taxonomy_image:
+            raise HTTPException(status_code=404, detail="Image data not found")
+        
+        # Convert to base64 regardless of original format
+        if isinstance(taxonomy_image, dict) and '$binary' in taxonomy_image:
+            binary_data = taxonomy_image['$binary']
+            if isinstance(binary_data, dict) and 'base64' in binary_data:
+                base64_data = binary_data['base64']
+            else:
+                base64_data = base64.b64encode(binary_data).decode('utf-8')
+        elif isinstance(taxonomy_image, bytes):
+            base64_data = base64.b64encode(taxonomy_image).decode('utf-8')
+        else:
+            base64_data = base64.b64encode(str(taxonomy_image).encode('utf-8')).decode('utf-8')
+        
+        image_format = doc.get("image_format", "svg")
+        
+        return {
+            "image_base64": base64_data,
+            "content_type": f"image/{image_format}",
+            "data_url": f"data:image/{image_format};base64,{base64_data}"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching taxonomy image: {str(e)}")
+
+# ---------------------- BATCH GET TAXONOMIES ---------------------- #
+@router.post("/taxonomy/batch-get")
+async def batch_get_taxonomies(data: BatchGetRequest):
+    """Fetch many taxonomies in one round trip; results follow request order, misses are explicit"""
+    docs = await batch_get(collection(TAXONOMY), data.keys, TAXONOMY_PROJECTION)
+    results = [{
+        "chapter_id": key.chapter_id,
+        "domain_id": key.domain_id,
+        "found": doc is not None,
+        "taxonomy": _taxonomy_response(doc) if doc else None
+    } for key, doc in zip(data.keys, docs)]
+    found = sum(result["found"] for result in results)
+    return {"results": results, "found": found, "missing": len(results) - found}
+
+# ---------------------- GET TAXONOMY ---------------------- #
+@router.get("/taxonomy/{chapter_id}/{domain_id}")
+async def get_taxonomy(chapter_id: str, domain_id: str):
+    doc = await collection(TAXONOMY).find_one({
+        "chapter_id": chapter_id,
+        "domain_id": domain_id
+    }, TAXONOMY_PROJECTION)
+    if not doc:
+        raise HTTPException(status_code=404, detail=f"Taxonomy '{domain_id}' not found for chapter '{chapter_id}'")
+    
+    return _taxonomy_response(doc)
+
+# ---------------------- GET TAXONOMY WITH BASE64 IMAGE ---------------------- #
+@router.get("/taxonomy-with-image/{chapter_id}/{domain_id}")
+async def get_taxonomy_with_image(chapter_id: str, domain_id: str):
+    try:
+        doc = await collection(TAXONOMY).find_one({
+            "chapter_id": chapter_id,
+            "domain_id": domain_id
+        })
+        if not doc:
+            raise HTTPException(status_code=404, detail=f"Taxonomy '{domain_id}' not found for chapter '{chapter_id}'")
+        
+        # Convert binary image to base64
+        taxonomy_image = await load_image(doc)
+        image_base64 = None
+        if taxonomy_image:
+            if isinstance(taxonomy_image, dict) and '$binary' in taxonomy_image:
+                binary_data = taxonomy_image['$binary']
+                if isinstance(binary_data, dict) and 'base64' in binary_data:
+                    image_base64 = binary_data['base64']
+                else:
+                    image_base64 = base64.b64encode(binary_data).decode('utf-8')
+            elif isinstance(taxonomy_image, bytes):
+                image_base64 = base64.b64encode(taxonomy_image).decode('utf-8')
+            else:
+                image_base64 = base64.b64encode(str(taxonomy_image).encode('utf-8')).decode('utf-8')
+        
+        taxonomy = {
+            "_id": str(doc["_id"]),
+            "chapter_id": doc.get("chapter_id", ""),
+            "domain_id": doc.get("domain_id", ""),
+            "domain_name": doc.get("domain_name", ""),
+            "image_format": doc.get("image_format", ""),
+            "image_base64": image_base64,
+            "image_src": f"data:image/{doc.get('image_format', 'svg')};base64,{image_base64}" if image_base64 else None
+        }
+        return taxonomy
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+# ---------------------- UPDATE TAXONOMY ---------------------- #
+@router.put("/taxonomy/{chapter_id}/{domain_id}")
+async def update_taxonomy(chapter_id: str, domain_id: str, data: TaxonomyUpdateRequest, expected_version: int | None = Depends(get_expected_version)):
+    key = {"chapter_id": chapter_id, "domain_id": domain_id}
+    updated = await collection(TAXONOMY).find_one_and_update(
+        {**key, **version_filter(expected_version)},
+        {
+            "$set": {
+                "domain_name": data.domain_name,
+                "image_format": data.image_format,
+                "updated_at": utc_now()
+            },
+            "$inc": {"version": 1}
+        },
+        projection={"version": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated:
+        await diagnose_failed_update(collection(TAXONOMY), key, expected_version, f"Taxonomy '{domain_id}' not found for chapter '{chapter_id}'")
+        raise HTTPException(status_code=409, detail="Taxonomy was modified concurrently, please reload and retry")
+    
+    log_activity("edited", "Taxonomy", f"Updated taxonomy '{data.domain_name}'", chapter_id, domain_id)
+    return JSONResponse(content={
+        "message": f"Taxonomy '{domain_id}' updated successfully",
+        "domain_id": domain_id,
+        "chapter_id": chapter_id,
+        "version": updated["version"]
+    })
+
+# ---------------------- UPDATE TAXONOMY IMAGE ---------------------- #
+@router.put("/taxonomy/image/{chapter_id}/{domain_id}")
+async def update_taxonomy_image(chapter_id: str, domain_id: str, image_data: str, expected_version: int | None = Depends(get_expected_version)):
+    """
+    Update taxonomy image with base64 encoded image data
+    """
+    try:
+        # Decode base64 image data to binary
+        binary_image = base64.b64decode(image_data)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image data: {str(e)}")
+    
+    key = {"chapter_id": chapter_id, "domain_id": domain_id}
+    # Reference the new blob before the document points at it, release the old one after
+    image_hash = await acquire_image(binary_image)
+    previous = await collection(TAXONOMY).find_one_and_update(
+        {**key, **version_filter(expected_version)},
+        {
+            "$set": {"image_hash": image_hash, "updated_at": utc_now()},
+            "$unset": {"taxonomy_image": ""},
+            "$inc": {"version": 1}
+        },
+        projection={"version": 1, "image_hash": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not previous:
+        await release_image(image_hash)
+        await diagnose_failed_update(collection(TAXONOMY), key, expected_version, f"Taxonomy '{domain_id}' not found for chapter '{chapter_id}'")
+        raise HTTPException(status_code=409, detail="Taxonomy was modified concurrently, please reload and retry")
+    await release_image(previous.get("image_hash"))
+    
+    log_activity("edited", "Taxonomy", f"Replaced image of taxonomy '{domain_id}'", chapter_id, domain_id)
+    return JSONResponse(content={
+        "message": f"Taxonomy image for '{domain_id}' updated successfully",
+        "domain_id": domain_id,
+        "chapter_id": chapter_id,
+        "version": previous.get("version", 0) + 1
+    })
+
+# ---------------------- CREATE TAXONOMY ---------------------- #
+@router.post("/taxonomy/{chapter_id}/{domain_id}")
+async def create_taxonomy(chapter_id: str, domain_id: str, data: TaxonomyCreateRequest):
+    try:
+        # Convert base64 image data to binary
+        binary_image = base64.b64decode(data.taxonomy_image) if data.taxonomy_image else None
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image data: {str(e)}")
+    
+    # Create new taxonomy document; the unique (chapter_id, domain_id) index rejects duplicates
+    image_hash = await acquire_image(binary_image)
+    try:
+        await collection(TAXONOMY).insert_one({
+            "chapter_id": chapter_id,
+            "domain_id": domain_id,
+            "domain_name": data.domain_name,
+            "image_format": data.image_format,
+            "image_hash": image_hash,
+            "version": 0,
+            "updated_at": utc_now()
+        })
+    except DuplicateKeyError:
+        await release_image(image_hash)
+        raise HTTPException(status_code=400, detail=f"Taxonomy '{domain_id}' already exists for chapter '{chapter_id}'")
+    log_activity("created", "Taxonomy", f"Created taxonomy '{data.domain_name}'", chapter_id, domain_id)
+    
+    return JSONResponse(content={
+        "message": f"Taxonomy '{domain_id}' created successfully",
+        "domain_id": domain_id,
+        "chapter_id": chapter_id
+    }, status_code=201)
+
+# ---------------------- UPSERT TAXONOMY ---------------------- #
+@router.put("/taxonomy/upsert/{chapter_id}/{domain_id}")
+async def upsert_taxonomy(chapter_id: str, domain_id: str, data: TaxonomyCreateRequest):
+    """Idempotent create-or-replace for ingestion pipelines"""
+    try:
+        binary_image = base64.b64decode(data.taxonomy_image) if data.taxonomy_image else None
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image data: {str(e)}")
+    
+    image_hash = await acquire_image(binary_image)
+    try:
+        doc = await upsert_document(
+            collection(TAXONOMY),
+            {"chapter_id": chapter_id, "domain_id": domain_id},
+            {
+                "$set": {
+                    "domain_name": data.domain_name,
+                    "image_format": data.image_format,
+                    "image_hash": image_hash,
+                    "updated_at": utc_now()
+                },
+                "$unset": {"taxonomy_image": ""},
+                "$inc": {"version": 1}
+            },
+            projection={"version": 1, "image_hash": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+    except Exception:
+        await release_image(image_hash)
+        raise
+    if doc is not None:
+        await release_image(doc.get("image_hash"))
+    log_activity("upserted", "Taxonomy", f"Upserted taxonomy '{data.domain_name}'", chapter_id, domain_id)
+    
+    return JSONResponse(content={
+        "message": f"Taxonomy '{domain_id}' {'created' if doc is None else 'updated'} successfully",
+        "domain_id": domain_id,
+        "chapter_id": chapter_id,
+        "created": doc is None,
+        "version": 1 if doc is None else doc.get("version", 0) + 1
+    }, status_code=201 if doc is None else 200)
+
+# ---------------------- DELETE TAXONOMY ---------------------- #
+@router.delete("/taxonomy/{chapter_id}/{domain_id}")
+async def delete_taxonomy(chapter_id: str, domain_id: str, expected_version: int | None = Depends(get_expected_version)):
+    key = {"chapter_id": chapter_id, "domain_id": domain_id}
+    deleted = await collection(TAXONOMY).find_one_and_delete({**key, **version_filter(expected_version)}, projection={"image_hash": 1})
+    
+    if not deleted:
+        await diagnose_failed_update(collection(TAXONOMY), key, expected_version, f"Taxonomy '{domain_id}' not found for chapter '{chapter_id}'")
+        raise HTTPException(status_code=409, detail="Taxonomy was modified concurrently, please reload and retry")
+    await release_image(deleted.get("image_hash"))
+    await record_tombstone(TAXONOMY, key)
+    log_activity("deleted", "Taxonomy", f"Deleted taxonomy '{domain_id}'", chapter_id, domain_id)
+    
+    return JSONResponse(content={
+        "message": f"Taxonomy '{domain_id}' deleted successfully",
+        "domain_id": domain_id,
+        "chapter_id": chapter_id
+    })
+
+# ====================== TAXONOMY DEBUG ENDPOINTS ====================== #
+
+# ---------------------- DEBUG: CHECK DATABASE DATA ---------------------- #
+@router.get("/taxonomy-debug/{taxonomy_id}")
+async def taxonomy_debug(taxonomy_id: str):
+    """Check what's stored in the database"""
+    try:
+        doc = await collection(TAXONOMY).find_one({"_id": ObjectId(taxonomy_id)})
+        
+        if not doc:
+            return {"error": "Taxonomy not found"}
+        
+        taxonomy_image = await load_image(doc)
+        
+        return {
+            "found": True,
+            "domain_name": doc.get("domain_name"),
+            "image_format": doc.get("image_format"),
+            "image_data_type": type(taxonomy_image).__name__,
+            "has_image_data": bool(taxonomy_image),
+            "image_data_length": len(taxonomy_image) if taxonomy_image else 0
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+# ---------------------- DEBUG: TEST IMAGE ENDPOINT ---------------------- #
+@router.get("/test-taxonomy-image/{taxonomy_id}")
+async def test_taxonomy_image(taxonomy_id: str):
+    """Test if image endpoint works"""
+    try:
+        doc = await collection(TAXONOMY).find_one({"_id": ObjectId(taxonomy_id)})
+        
+        if not doc:
+            return {"status": "error", "message": "Taxonomy not found"}
+        
+        taxonomy_image = await load_image(doc)
+        
+        return {
+            "status": "success",
+            "found": True,
+            "has_image": bool(taxonomy_image),
+            "image_type": type(taxonomy_image).__name__ if taxonomy_image else "None",
+            "image_length": len(taxonomy_image) if taxonomy_image else 0
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
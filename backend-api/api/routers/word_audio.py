@@ -0,0 +1,268 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pymongo import ReturnDocument
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import asyncio
+import hashlib
+import os
+import shutil
+
+from api import word_snapshot
+from api.activity import log_activity
+from api.concurrency import diagnose_failed_update, get_expected_version, version_filter
+from api.db import DOMAIN_WORDS, WORD_AUDIO_BUCKET, collection, gridfs_bucket
+from api.sync import utc_now
+
+router = APIRouter(tags=["domain word audio"])
+
+# ====================== DOMAIN WORD AUDIO ENDPOINTS ====================== #
+# Pronunciation audio is stored in a GridFS bucket, never in the word document.
+# The word only keeps a small `audio` pointer:
+#   {"file_id", "content_type", "length", "etag", "variants": {format: {...}}}
+# so word listings and point reads stay the same size with or without audio.
+#
+# When AUDIO_TRANSCODE_FORMAT is set (and ffmpeg is installed) each upload is
+# also transcoded in the background, at most AUDIO_TRANSCODE_WORKERS at a time,
+# and the compressed copy is served for ?format=<name>.
+AUDIO_MAX_BYTES = int(os.environ.get("AUDIO_MAX_BYTES", 10 * 1024 * 1024))
+AUDIO_STREAM_CHUNK = 256 * 1024
+AUDIO_TRANSCODE_FORMAT = os.environ.get("AUDIO_TRANSCODE_FORMAT")  # e.g. "opus" or "mp3"
+AUDIO_TRANSCODE_WORKERS = int(os.environ.get("AUDIO_TRANSCODE_WORKERS", 2))
+
+TRANSCODE_FORMATS = {
+    "opus": ("audio/ogg", ["-c:a", "libopus", "-b:a", "32k", "-f", "ogg"]),
+    "mp3": ("audio/mpeg", ["-c:a", "libmp3lame", "-b:a", "64k", "-f", "mp3"]),
+}
+
+_transcode_slots = asyncio.Semaphore(AUDIO_TRANSCODE_WORKERS)
+_transcode_tasks = set()
+
+def _word_key(chapter_id: str, domain_id: str):
+    return {"chapter_id": chapter_id, "domain_id": domain_id}
+
+def parse_range(range_header: str, length: int):
+    """Return (start, end) inclusive for a single 'bytes=' range, None to serve the whole file.
+
+    Raises 416 when the range can't be satisfied.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        # Multi-range requests are answered with the full body, which RFC 9110 allows
+        return None
+    start_text, _, end_text = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else length - 1
+        else:
+            suffix = int(end_text)
+            if suffix == 0:
+                raise ValueError
+            start, end = max(length - suffix, 0), length - 1
+    except ValueError:
+        start, end = length, length  # malformed -> unsatisfiable
+    end = min(end, length - 1)
+    if start > end or start >= length:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{length}"}
+        )
+    return start, end
+
+async def _stream_file(file_id, start: int, end: int):
+    grid_out = await gridfs_bucket(WORD_AUDIO_BUCKET).open_download_stream(file_id)
+    grid_out.seek(start)
+    remaining = end - start + 1
+    while remaining > 0:
+        chunk = await grid_out.read(min(AUDIO_STREAM_CHUNK, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+
+async def delete_audio_files(audio: dict):
+    bucket = gridfs_bucket(WORD_AUDIO_BUCKET)
+    file_ids = [audio["file_id"]] + [variant["file_id"] for variant in audio.get("variants", {}).values()]
+    for file_id in file_ids:
+        try:
+            await bucket.delete(file_id)
+        except Exception as e:
+            print(f"❌ Failed to delete audio file {file_id}: {str(e)}")
+
+async def _transcode_audio(chapter_id: str, domain_id: str, source: bytes, source_etag: str, audio_format: str):
+    content_type, codec_args = TRANSCODE_FORMATS[audio_format]
+    async with _transcode_slots:
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0", "-vn", *codec_args, "pipe:1",
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        output, errors = await process.communicate(input=source)
+    if process.returncode != 0 or not output:
+        print(f"❌ Transcoding audio for '{domain_id}' to {audio_format} failed: {errors.decode(errors='replace')}")
+        return
+
+    bucket = gridfs_bucket(WORD_AUDIO_BUCKET)
+    file_id = await bucket.upload_from_stream(
+        f"{chapter_id}/{domain_id}.{audio_format}", output,
+        metadata={"chapter_id": chapter_id, "domain_id": domain_id, "content_type": content_type, "variant": audio_format}
+    )
+    # Only attach the variant if the source audio wasn't replaced meanwhile
+    result = await collection(DOMAIN_WORDS).update_one(
+        {**_word_key(chapter_id, domain_id), "audio.etag": source_etag},
+        {"$set": {f"audio.variants.{audio_format}": {
+            "file_id": file_id,
+            "content_type": content_type,
+            "length": len(output),
+            "etag": hashlib.sha256(output).hexdigest()
+        }}}
+    )
+    if result.matched_count == 0:
+        await bucket.delete(file_id)
+
+# ---------------------- UPLOAD DOMAIN WORD AUDIO ---------------------- #
+@router.put("/domain-words/audio/{chapter_id}/{domain_id}")
+async def upload_domain_word_audio(chapter_id: str, domain_id: str, request: Request, expected_version: int | None = Depends(get_expected_version)):
+    """Upload pronunciation audio as the raw request body (Content-Type: audio/...)"""
+    content_type = request.headers.get("content-type", "application/octet-stream")
+    if not content_type.startswith("audio/"):
+        raise HTTPException(status_code=415, detail="Audio must be uploaded with an audio/* Content-Type")
+
+    key = _word_key(chapter_id, domain_id)
+    if not await collection(DOMAIN_WORDS).find_one(key, {"_id": 1}):
+        raise HTTPException(status_code=404, detail=f"Domain word '{domain_id}' not found for chapter '{chapter_id}'")
+
+    bucket = gridfs_bucket(WORD_AUDIO_BUCKET)
+    grid_in = bucket.open_upload_stream(
+        f"{chapter_id}/{domain_id}",
+        metadata={"chapter_id": chapter_id, "domain_id": domain_id, "content_type": content_type}
+    )
+    digest = hashlib.sha256()
+    length = 0
+    keep_source = AUDIO_TRANSCODE_FORMAT in TRANSCODE_FORMATS and shutil.which("ffmpeg")
+    source_chunks = []
+    try:
+        async for chunk in request.stream():
+            length += len(chunk)
+            if length > AUDIO_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"Audio larger than {AUDIO_MAX_BYTES} bytes")
+            digest.update(chunk)
+            if keep_source:
+                source_chunks.append(chunk)
+            await grid_in.write(chunk)
+        await grid_in.close()
+    except BaseException:
+        await grid_in.abort()
+        raise
+    if length == 0:
+        await bucket.delete(grid_in._id)
+        raise HTTPException(status_code=400, detail="Audio body is empty")
+
+    etag = digest.hexdigest()
+    # The audio is part of the word (audio_url), so it bumps the version like any other edit
+    old = await collection(DOMAIN_WORDS).find_one_and_update(
+        {**key, **version_filter(expected_version)},
+        {
+            "$set": {"audio": {
+                "file_id": grid_in._id,
+                "content_type": content_type,
+                "length": length,
+                "etag": etag,
+                "variants": {}
+            }, "updated_at": utc_now()},
+            "$inc": {"version": 1}
+        },
+        projection={"audio": 1, "version": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if old is None:
+        # Word was deleted or edited while uploading
+        await bucket.delete(grid_in._id)
+        await diagnose_failed_update(collection(DOMAIN_WORDS), key, expected_version, f"Domain word '{domain_id}' not found for chapter '{chapter_id}'")
+        raise HTTPException(status_code=409, detail="Domain word was modified concurrently, please reload and retry")
+    if old.get("audio"):
+        await delete_audio_files(old["audio"])
+
+    if keep_source:
+        task = asyncio.create_task(_transcode_audio(chapter_id, domain_id, b"".join(source_chunks), etag, AUDIO_TRANSCODE_FORMAT))
+        _transcode_tasks.add(task)
+        task.add_done_callback(_transcode_tasks.discard)
+
+    await word_snapshot.notify_write()
+    log_activity("edited", "Domain Words", f"Uploaded audio for '{domain_id}' ({length} bytes)", chapter_id, domain_id)
+    return JSONResponse(content={
+        "message": f"Audio for domain word '{domain_id}' uploaded successfully",
+        "domain_id": domain_id,
+        "chapter_id": chapter_id,
+        "length": length,
+        "etag": etag,
+        "audio_url": f"/domain-words/audio/{chapter_id}/{domain_id}",
+        "version": old.get("version", 0) + 1
+    }, status_code=201)
+
+# ---------------------- STREAM DOMAIN WORD AUDIO ---------------------- #
+@router.get("/domain-words/audio/{chapter_id}/{domain_id}")
+async def get_domain_word_audio(chapter_id: str, domain_id: str, request: Request, format: str = None):
+    doc = await collection(DOMAIN_WORDS).find_one(_word_key(chapter_id, domain_id), {"audio": 1})
+    if not doc:
+        raise HTTPException(status_code=404, detail=f"Domain word '{domain_id}' not found for chapter '{chapter_id}'")
+    audio = doc.get("audio")
+    if not audio:
+        raise HTTPException(status_code=404, detail=f"No audio for domain word '{domain_id}'")
+
+    # Fall back to the original upload until the requested variant is ready
+    selected = audio.get("variants", {}).get(format, audio) if format else audio
+    etag = f'"{selected["etag"]}"'
+    length = selected["length"]
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache",
+        "Content-Disposition": "inline"
+    }
+
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if not if_range or if_range == etag:
+        byte_range = parse_range(request.headers.get("range"), length)
+
+    if byte_range is None:
+        start, end, status_code = 0, length - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        _stream_file(selected["file_id"], start, end),
+        status_code=status_code,
+        media_type=selected["content_type"],
+        headers=headers
+    )
+
+# ---------------------- DELETE DOMAIN WORD AUDIO ---------------------- #
+@router.delete("/domain-words/audio/{chapter_id}/{domain_id}")
+async def delete_domain_word_audio(chapter_id: str, domain_id: str, expected_version: int | None = Depends(get_expected_version)):
+    key = _word_key(chapter_id, domain_id)
+    old = await collection(DOMAIN_WORDS).find_one_and_update(
+        {**key, "audio": {"$exists": True}, **version_filter(expected_version)},
+        {"$unset": {"audio": ""}, "$set": {"updated_at": utc_now()}, "$inc": {"version": 1}},
+        projection={"audio": 1, "version": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if old is None:
+        current = await diagnose_failed_update(collection(DOMAIN_WORDS), key, expected_version, f"Domain word '{domain_id}' not found for chapter '{chapter_id}'")
+        if not current.get("audio"):
+            raise HTTPException(status_code=404, detail=f"No audio for domain word '{domain_id}'")
+        raise HTTPException(status_code=409, detail="Domain word was modified concurrently, please reload and retry")
+
+    await delete_audio_files(old["audio"])
+    await word_snapshot.notify_write()
+    log_activity("deleted", "Domain Words", f"Deleted audio for '{domain_id}'", chapter_id, domain_id)
+    return JSONResponse(content={
+        "message": f"Audio for domain word '{domain_id}' deleted successfully",
+        "domain_id": domain_id,
+        "chapter_id": chapter_id,
+        "version": old.get("version", 0) + 1
+    })
@@ -0,0 +1,148 @@
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+import os
+
+from api.concurrency import version_filter
+from api.db import FULL_SUMMARY, SUMMARY_SENTENCES, collection
+from api.revisions import REVISION_SNAPSHOT_INTERVAL
+from api.sync import utc_now
+
+# ====================== SENTENCE STORAGE ====================== #
+# By default a chapter's sentences live in its `full_summary` array. A chapter
+# switched to sentence storage instead keeps one SUMMARY_SENTENCES document per
+# sentence ({chapter_id, position, text}), indexed by position, so reading a
+# range or editing one sentence touches constant-size documents and the
+# chapter is no longer bound by the 16 MB document limit. The chapter document
+# keeps `storage`, `sentence_count`, `version` and `updated_at`.
+#
+# Every write first bumps the chapter version conditionally on the version it
+# read, then changes the sentence documents. That is not a transaction: a
+# write racing the sentence updates of another one sees the version conflict
+# only if it read before the bump.
+SENTENCE_STORAGE = "sentences"
+ARRAY_STORAGE = "array"
+SENTENCE_INSERT_BATCH = int(os.environ.get("SENTENCE_INSERT_BATCH", 1000))
+
+# Filter for array-mode updates; legacy chapters have no storage field
+NOT_SENTENCE_STORAGE = {"storage": {"$ne": SENTENCE_STORAGE}}
+
+def uses_sentence_storage(doc: dict):
+    return doc.get("storage") == SENTENCE_STORAGE
+
+# ---------------------- READS ---------------------- #
+async def load_sentences(chapter_id: str, offset: int = 0, limit: int | None = None):
+    cursor = collection(SUMMARY_SENTENCES).find(
+        {"chapter_id": chapter_id, "position": {"$gte": offset}},
+        {"_id": 0, "text": 1}
+    ).sort("position", 1)
+    if limit is not None:
+        cursor = cursor.limit(limit)
+    return [doc["text"] async for doc in cursor]
+
+async def _find_sentence(chapter_id: str, index: int):
+    doc = await collection(SUMMARY_SENTENCES).find_one({"chapter_id": chapter_id, "position": index})
+    if not doc:
+        raise HTTPException(status_code=400, detail="Invalid index number")
+    return doc
+
+# ---------------------- WRITE HELPERS ---------------------- #
+async def _insert_sentences(chapter_id: str, sentences: list):
+    for start in range(0, len(sentences), SENTENCE_INSERT_BATCH):
+        await collection(SUMMARY_SENTENCES).insert_many([
+            {"chapter_id": chapter_id, "position": start + offset, "text": text}
+            for offset, text in enumerate(sentences[start:start + SENTENCE_INSERT_BATCH])
+        ])
+
+async def _claim_version(chapter_id: str, current: dict, set_fields: dict = None, inc_fields: dict = None):
+    """Bump the chapter version if it is still the one `current` was read at, else 409"""
+    doc = await collection(FULL_SUMMARY).find_one_and_update(
+        {"chapter_id": chapter_id, "storage": SENTENCE_STORAGE, **version_filter(current.get("version", 0))},
+        {"$set": {"updated_at": utc_now(), **(set_fields or {})}, "$inc": {"version": 1, **(inc_fields or {})}},
+        projection={"version": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not doc:
+        raise HTTPException(status_code=409, detail="Summary was modified concurrently, please reload and retry")
+
+async def _revision_base(chapter_id: str, current: dict):
+    """The old_doc record_summary_revision needs; the full text only when it writes a snapshot"""
+    version = current.get("version")
+    needs_content = version is None or (version + 1) % REVISION_SNAPSHOT_INTERVAL == 0
+    return {"version": version, "full_summary": await load_sentences(chapter_id) if needs_content else None}
+
+# ---------------------- WRITES ---------------------- #
+async def replace_sentences(chapter_id: str, current: dict, sentences: list):
+    """Replace every sentence; returns the old_doc for the revision log"""
+    old_doc = {"version": current.get("version"), "full_summary": await load_sentences(chapter_id)}
+    await _claim_version(chapter_id, current, set_fields={"sentence_count": len(sentences)})
+    await collection(SUMMARY_SENTENCES).delete_many({"chapter_id": chapter_id})
+    await _insert_sentences(chapter_id, sentences)
+    return old_doc
+
+async def edit_sentence(chapter_id: str, current: dict, index: int, replace_text: str, with_text: str):
+    """Replace text inside one sentence; returns (old sentence, new sentence, old_doc)"""
+    sentence_doc = await _find_sentence(chapter_id, index)
+    if replace_text not in sentence_doc["text"]:
+        raise HTTPException(status_code=400, detail=f"'{replace_text}' not found in sentence")
+    old_doc = await _revision_base(chapter_id, current)
+    new_sentence = sentence_doc["text"].replace(replace_text, with_text)
+    await _claim_version(chapter_id, current)
+    await collection(SUMMARY_SENTENCES).update_one({"_id": sentence_doc["_id"]}, {"$set": {"text": new_sentence}})
+    return sentence_doc["text"], new_sentence, old_doc
+
+async def delete_sentence(chapter_id: str, current: dict, index: int):
+    """Remove one sentence and close the gap; returns (removed sentence, old_doc)"""
+    sentence_doc = await _find_sentence(chapter_id, index)
+    old_doc = await _revision_base(chapter_id, current)
+    await _claim_version(chapter_id, current, inc_fields={"sentence_count": -1})
+    await collection(SUMMARY_SENTENCES).delete_one({"_id": sentence_doc["_id"]})
+    await collection(SUMMARY_SENTENCES).update_many(
+        {"chapter_id": chapter_id, "position": {"$gt": index}},
+        {"$inc": {"position": -1}}
+    )
+    return sentence_doc["text"], old_doc
+
+async def rewrite_sentences(chapter_id: str, current: dict, sentence_ids: list, text_expr: dict):
+    """Set the text of several sentences to a pipeline expression of their current text.
+    Returns (old_doc, delta) for the revision log, built from the stored results."""
+    old_doc = await _revision_base(chapter_id, current)
+    await _claim_version(chapter_id, current)
+    await collection(SUMMARY_SENTENCES).update_many({"_id": {"$in": sentence_ids}}, [{"$set": {"text": text_expr}}])
+    cursor = collection(SUMMARY_SENTENCES).find({"_id": {"$in": sentence_ids}}, {"position": 1, "text": 1}).sort("position", 1)
+    delta = [[doc["position"], doc["position"] + 1, [doc["text"]]] async for doc in cursor]
+    return old_doc, delta
+
+# ---------------------- CONVERSION ---------------------- #
+async def convert_storage(chapter_id: str, mode: str):
+    """Move a chapter between array and sentence storage; content and version are unchanged"""
+    doc = await collection(FULL_SUMMARY).find_one({"chapter_id": chapter_id})
+    if not doc:
+        raise HTTPException(status_code=404, detail=f"Chapter '{chapter_id}' not found")
+    current_mode = SENTENCE_STORAGE if uses_sentence_storage(doc) else ARRAY_STORAGE
+    if current_mode == mode:
+        return 0
+
+    guard = {"chapter_id": chapter_id, **version_filter(doc.get("version", 0))}
+    if mode == SENTENCE_STORAGE:
+        sentences = doc.get("full_summary") or []
+        # Leftovers of an interrupted conversion
+        await collection(SUMMARY_SENTENCES).delete_many({"chapter_id": chapter_id})
+        await _insert_sentences(chapter_id, sentences)
+        result = await collection(FULL_SUMMARY).update_one(
+            {**guard, **NOT_SENTENCE_STORAGE},
+            {"$set": {"storage": SENTENCE_STORAGE, "sentence_count": len(sentences)}, "$unset": {"full_summary": ""}}
+        )
+        if not result.matched_count:
+            await collection(SUMMARY_SENTENCES).delete_many({"chapter_id": chapter_id})
+            raise HTTPException(status_code=409, detail="Summary was modified concurrently, please retry")
+        return len(sentences)
+
+    sentences = await load_sentences(chapter_id)
+    result = await collection(FULL_SUMMARY).update_one(
+        {**guard, "storage": SENTENCE_STORAGE},
+        {"$set": {"full_summary": sentences}, "$unset": {"storage": "", "sentence_count": ""}}
+    )
+    if not result.matched_count:
+        raise HTTPException(status_code=409, detail="Summary was modified concurrently, please retry")
+    await collection(SUMMARY_SENTENCES).delete_many({"chapter_id": chapter_id})
+    return len(sentences)
@@ -0,0 +1,138 @@
+from bson import ObjectId
+from pymongo import ReturnDocument
+import base64
+import datetime
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+
+from api.db import SESSIONS, USERS, collection
+
+# ====================== SESSION TOKENS ====================== #
+# SESSION_TOKEN_MODE=database (default) keeps random tokens in the `sessions`
+# collection. SESSION_TOKEN_MODE=signed issues HMAC-SHA256 signed tokens that
+# carry username, user_id, domain, expiry and the user's session generation, so they
+# are verified without a database lookup. Revocation bumps the per-user
+# `session_generation` counter (logout, reset_password); generations are cached
+# for SESSION_GENERATION_CACHE_TTL seconds, which bounds how long a revoked
+# token can still be accepted by other workers.
+SESSION_TOKEN_MODE = os.environ.get("SESSION_TOKEN_MODE", "database")
+SESSION_TTL = datetime.timedelta(hours=24)
+SESSION_GENERATION_CACHE_TTL = float(os.environ.get("SESSION_GENERATION_CACHE_TTL", 30))
+# All workers must share this key for signed tokens to validate across them
+SESSION_SIGNING_KEY = os.environ.get("SESSION_SIGNING_KEY", "").encode() or secrets.token_bytes(32)
+if SESSION_TOKEN_MODE == "signed" and "SESSION_SIGNING_KEY" not in os.environ:
+    print("⚠️ SESSION_SIGNING_KEY not set, signed sessions will not survive restarts or span workers")
+
+# Middlewares that need the caller on every request (domain partitioning, the
+# activity log) share resolved sessions for SESSION_LOOKUP_CACHE_TTL seconds
+SESSION_LOOKUP_CACHE_TTL = float(os.environ.get("SESSION_LOOKUP_CACHE_TTL", 30))
+
+_session_generation_cache = {}  # user_id -> (generation, cached_at)
+_resolved_sessions = {}  # token -> (session or None, cached_at)
+
+def _b64url_encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def _b64url_decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def is_signed_session_token(session_token: str) -> bool:
+    # Database tokens are plain hex, signed tokens are payload.signature
+    return "." in session_token
+
+def issue_signed_session_token(username: str, user_id: str, generation: int, domain: str = None) -> str:
+    payload = json.dumps({
+        "u": username,
+        "uid": user_id,
+        "d": domain,
+        "exp": int(time.time() + SESSION_TTL.total_seconds()),
+        "gen": generation
+    }, separators=(",", ":")).encode()
+    signature = hmac.new(SESSION_SIGNING_KEY, payload, hashlib.sha256).digest()
+    return f"{_b64url_encode(payload)}.{_b64url_encode(signature)}"
+
+def decode_signed_session_token(session_token: str):
+    """Check signature and expiry; returns the payload dict or None. Pure CPU."""
+    try:
+        payload_part, signature_part = session_token.split(".")
+        payload = _b64url_decode(payload_part)
+        signature = _b64url_decode(signature_part)
+    except ValueError:
+        return None
+    expected = hmac.new(SESSION_SIGNING_KEY, payload, hashlib.sha256).digest()
+    if not hmac.compare_digest(signature, expected):
+        return None
+    claims = json.loads(payload)
+    if claims["exp"] <= time.time():
+        return None
+    return claims
+
+async def get_session_generation(user_id: str) -> int:
+    cached = _session_generation_cache.get(user_id)
+    if cached and time.monotonic() - cached[1] < SESSION_GENERATION_CACHE_TTL:
+        return cached[0]
+    user = await collection(USERS).find_one({"_id": ObjectId(user_id)}, {"session_generation": 1})
+    generation = user.get("session_generation", 0) if user else -1
+    _session_generation_cache[user_id] = (generation, time.monotonic())
+    return generation
+
+async def revoke_signed_sessions(user_id: str):
+    """Invalidate every signed token issued to this user so far"""
+    user = await collection(USERS).find_one_and_update(
+        {"_id": ObjectId(user_id)},
+        {"$inc": {"session_generation": 1}},
+        projection={"session_generation": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if user:
+        _session_generation_cache[user_id] = (user["session_generation"], time.monotonic())
+
+async def resolve_session(session_token: str):
+    """Return {"username", "user_id", "domain"} for a valid session token, else None"""
+    if is_signed_session_token(session_token):
+        claims = decode_signed_session_token(session_token)
+        if not claims or claims["gen"] != await get_session_generation(claims["uid"]):
+            return None
+        return {"username": claims["u"], "user_id": claims["uid"], "domain": claims.get("d")}
+    
+    session = await collection(SESSIONS).find_one({
+        "session_token": session_token,
+        "expires_at": {"$gt": datetime.datetime.utcnow()}
+    })
+    if not session:
+        return None
+    domain = session.get("domain")
+    if "domain" not in session:
+        # Sessions created before domains were recorded on them
+        user = await collection(USERS).find_one({"_id": ObjectId(session["user_id"])}, {"domain": 1})
+        domain = user.get("domain") if user else None
+    return {"username": session["username"], "user_id": session["user_id"], "domain": domain}
+
+def request_session_token(request):
+    """Session token from `Authorization: Bearer <token>` or X-Session-Token"""
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        return authorization[7:].strip()
+    return request.headers.get("x-session-token")
+
+def peek_cached_session(session_token: str):
+    """The cached session for a token if there is a fresh one; never looks anything up"""
+    cached = _resolved_sessions.get(session_token)
+    if cached and time.monotonic() - cached[1] < SESSION_LOOKUP_CACHE_TTL:
+        return cached[0]
+    return None
+
+async def cached_session(session_token: str):
+    """resolve_session(), cached per token so per-request callers don't pay a lookup each"""
+    cached = _resolved_sessions.get(session_token)
+    if cached and time.monotonic() - cached[1] < SESSION_LOOKUP_CACHE_TTL:
+        return cached[0]
+    session = await resolve_session(session_token)
+    if len(_resolved_sessions) > 10000:
+        _resolved_sessions.clear()
+    _resolved_sessions[session_token] = (session, time.monotonic())
+    return session
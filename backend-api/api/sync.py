@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+import os
+
+from api.db import DOMAIN_WORDS, FULL_SUMMARY, SECTION_SUMMARY, TAXONOMY, TOMBSTONES, collection
+
+# ---------------------- DELTA SYNC ---------------------- #
+# Every write stamps `updated_at`; deletes leave a tombstone. The /all-*
+# endpoints accept ?since=<watermark> and then return only documents changed
+# since it, the keys deleted since it, and a new watermark.
+#
+# The watermark trails the query start by SYNC_OVERLAP_SECONDS so a write that
+# was stamped just before the query but committed after it is picked up by the
+# next sync. Clients may therefore see a document twice, which is harmless
+# since results are keyed. Tombstones expire after TOMBSTONE_TTL_DAYS; a
+# client whose watermark is older than that is told to do a full resync.
+SYNC_OVERLAP_SECONDS = float(os.environ.get("SYNC_OVERLAP_SECONDS", 5))
+TOMBSTONE_TTL_DAYS = int(os.environ.get("TOMBSTONE_TTL_DAYS", 30))
+
+# Collections served by /all-* endpoints
+SYNCED_COLLECTIONS = [FULL_SUMMARY, SECTION_SUMMARY, DOMAIN_WORDS, TAXONOMY]
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+def get_since(since: str | None = None):
+    if since is None:
+        return None
+    try:
+        value = datetime.fromisoformat(since.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since must be a watermark returned by a previous sync")
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def _format_watermark(value: datetime):
+    # "Z" rather than "+00:00" so the watermark can go in a query string unescaped
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+def new_watermark(as_of: datetime | None = None):
+    """Take this before running the query (or pass the time a snapshot was built from)"""
+    return _format_watermark((as_of or utc_now()) - timedelta(seconds=SYNC_OVERLAP_SECONDS))
+
+def changed_since(since: datetime | None):
+    return {} if since is None else {"updated_at": {"$gte": since}}
+
+async def create_sync_indexes():
+    for name in SYNCED_COLLECTIONS:
+        await collection(name).create_index([("updated_at", 1)])
+    await collection(TOMBSTONES).create_index([("collection", 1), ("deleted_at", 1)])
+    await collection(TOMBSTONES).create_index("deleted_at", expireAfterSeconds=TOMBSTONE_TTL_DAYS * 24 * 3600)
+
+async def record_tombstone(collection_name: str, key: dict):
+    try:
+        await collection(TOMBSTONES).insert_one({"collection": collection_name, **key, "deleted_at": utc_now()})
+    except Exception as e:
+        print(f"❌ Error recording tombstone for {collection_name} {key}: {str(e)}")
+
+async def sync_fields(collection_name: str, since: datetime | None, watermark: str, items: list, key_fields: tuple):
+    """Watermark plus, for a delta request, the keys deleted since `since`"""
+    if since is None:
+        return {"watermark": watermark}
+
+    # A key that was deleted and then re-created shows up as changed, not deleted
+    changed_keys = {tuple(item[field] for field in key_fields) for item in items}
+    deleted = []
+    cursor = collection(TOMBSTONES).find(
+        {"collection": collection_name, "deleted_at": {"$gte": since}},
+        {"_id": 0, "deleted_at": 1, **{field: 1 for field in key_fields}}
+    ).sort("deleted_at", 1)
+    async for doc in cursor:
+        key = tuple(doc.get(field) for field in key_fields)
+        if key not in changed_keys:
+            deleted.append({**dict(zip(key_fields, key)), "deleted_at": _format_watermark(doc["deleted_at"].replace(tzinfo=timezone.utc))})
+    return {
+        "watermark": watermark,
+        "deleted": deleted,
+        "full_resync_required": since < utc_now() - timedelta(days=TOMBSTONE_TTL_DAYS)
+    }
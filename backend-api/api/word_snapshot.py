@@ -0,0 +1,308 @@
+from array import array
+import asyncio
+import json
+import mmap
+import os
+import struct
+import time
+
+from pymongo import ReturnDocument
+
+from api.concurrency import upsert_document
+from api.db import COUNTERS, DOMAIN_WORDS, collection, current_domain, partition_slug
+
+# ====================== DOMAIN WORD SNAPSHOT ====================== #
+# The domain word catalog is read-mostly and the same in every worker, so it can
+# be served from a compact binary file that each worker mmaps read-only. The
+# pages live once in the OS page cache no matter how many workers map them,
+# so per-worker memory stays flat as the vocabulary grows.
+#
+# File layout (native byte order; the file is per host):
+#   header   magic, word_count, string_count, build_started_ns, generation (32 bytes)
+#   offsets  (string_count + 1) x uint64 - start of each string in the blob
+#   records  word_count x len(SNAPSHOT_FIELDS) x uint32 - string ids, or the raw
+#            value for the integer fields; words sorted by (chapter_id, domain_id)
+#   blob     interned UTF-8 strings, each distinct value stored once
+#
+# Every domain word write bumps a generation counter in Mongo (COUNTERS), and a
+# snapshot records the generation it was built from. Readers on any host
+# compare it with the counter, cached for DOMAIN_WORD_GENERATION_TTL seconds,
+# and fall back to Mongo (and request a rebuild) once it has moved, so writes
+# made by other hosts are seen within that TTL. Writes that bypass the API, such
+# as import scripts, don't bump the counter; snapshots older than
+# DOMAIN_WORD_SNAPSHOT_MAX_AGE seconds are therefore never served either.
+# Rebuilt files are written to a temp file and os.replace()d; readers remap
+# when the inode changes.
+#
+# Enabled by setting DOMAIN_WORD_SNAPSHOT_PATH; domain partitions get their own
+# file next to it (<path>.<domain>).
+SNAPSHOT_PATH = os.environ.get("DOMAIN_WORD_SNAPSHOT_PATH")
+SNAPSHOT_REBUILD_DELAY = float(os.environ.get("DOMAIN_WORD_SNAPSHOT_REBUILD_DELAY", 1.0))  # seconds, batches bursts of writes
+SNAPSHOT_MAX_AGE = float(os.environ.get("DOMAIN_WORD_SNAPSHOT_MAX_AGE", 300))  # seconds
+GENERATION_TTL = float(os.environ.get("DOMAIN_WORD_GENERATION_TTL", 2.0))  # seconds
+
+SNAPSHOT_MAGIC = b"DWSNAP02"
+HEADER = struct.Struct("=8sIIQQ")  # 32 bytes, keeps the offset table 8-byte aligned
+GENERATION_ID = "domain_words"  # _id of the counter document
+NULL_ID = 0xFFFFFFFF
+
+# String fields hold string ids; JSON fields are stored as interned JSON text
+SNAPSHOT_FIELDS = ("_id", "chapter_id", "domain_id", "name", "definition", "mwe_type",
+                   "translations", "word_structure", "tokens_with_pos", "audio_url", "is_mwe", "version")
+JSON_FIELDS = {"translations", "word_structure", "tokens_with_pos"}
+INT_FIELDS = {"is_mwe", "version"}
+FIELD_INDEX = {field: i for i, field in enumerate(SNAPSHOT_FIELDS)}
+
+_snapshots = {}  # path -> ((inode, mtime), WordSnapshot)
+_generations = {}  # path -> (generation, fetched_at)
+_pending_domains = set()
+_rebuild_event = asyncio.Event()
+_rebuild_task = None
+
+# ---------------------- READER ---------------------- #
+class WordSnapshot:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.word_count, string_count, self.build_started_ns, self.generation = HEADER.unpack_from(self._mm, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a domain word snapshot")
+
+        view = memoryview(self._mm)
+        offsets_start = HEADER.size
+        records_start = offsets_start + (string_count + 1) * 8
+        self._blob_start = records_start + self.word_count * len(SNAPSHOT_FIELDS) * 4
+        # Casts are views onto the mapping, nothing is copied
+        self._offsets = view[offsets_start:records_start].cast("Q")
+        self._records = view[records_start:self._blob_start].cast("I")
+
+    def __len__(self):
+        return self.word_count
+
+    def _raw(self, string_id: int):
+        return self._mm[self._blob_start + self._offsets[string_id]:self._blob_start + self._offsets[string_id + 1]]
+
+    def _field(self, index: int, field: str):
+        value = self._records[index * len(SNAPSHOT_FIELDS) + FIELD_INDEX[field]]
+        if field in INT_FIELDS:
+            return bool(value) if field == "is_mwe" else value
+        if value == NULL_ID:
+            return None
+        text = self._raw(value).decode("utf-8")
+        return json.loads(text) if field in JSON_FIELDS else text
+
+    def _key(self, index: int):
+        base = index * len(SNAPSHOT_FIELDS)
+        return (self._raw(self._records[base + FIELD_INDEX["chapter_id"]]),
+                self._raw(self._records[base + FIELD_INDEX["domain_id"]]))
+
+    def word(self, index: int):
+        return {field: self._field(index, field) for field in SNAPSHOT_FIELDS}
+
+    def _lower_bound(self, key: tuple):
+        low, high = 0, self.word_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get(self, chapter_id: str, domain_id: str):
+        key = (chapter_id.encode("utf-8"), domain_id.encode("utf-8"))
+        index = self._lower_bound(key)
+        if index < self.word_count and self._key(index) == key:
+            return self.word(index)
+        return None
+
+    def chapter_range(self, chapter_id: str = None):
+        """Record indexes for one chapter (contiguous, since records are sorted) or all words"""
+        if chapter_id is None:
+            return range(self.word_count)
+        encoded = chapter_id.encode("utf-8")
+        return range(self._lower_bound((encoded, b"")), self._lower_bound((encoded + b"\x00", b"")))
+
+    def search(self, query: str, chapter_id: str = None, limit: int = 50):
+        """Words whose name or definition contains `query` (case-insensitive)"""
+        needle = query.lower()
+        matches = []
+        for index in self.chapter_range(chapter_id):
+            name, definition = self._field(index, "name") or "", self._field(index, "definition") or ""
+            if needle in name.lower() or needle in definition.lower():
+                matches.append(self.word(index))
+                if len(matches) >= limit:
+                    break
+        return matches
+
+# ---------------------- BUILDER ---------------------- #
+def _snapshot_path():
+    # One snapshot per domain partition
+    slug = partition_slug()
+    return SNAPSHOT_PATH if slug is None else f"{SNAPSHOT_PATH}.{slug}"
+
+def write_snapshot(path: str, words: list, build_started_ns: int, generation: int):
+    """Serialize words (dicts with SNAPSHOT_FIELDS) and atomically replace the snapshot file"""
+    strings = {}
+    blob = bytearray()
+    offsets = array("Q", [0])
+
+    def intern(value):
+        if value is None:
+            return NULL_ID
+        encoded = value.encode("utf-8")
+        string_id = strings.get(encoded)
+        if string_id is None:
+            string_id = strings[encoded] = len(offsets) - 1
+            blob.extend(encoded)
+            offsets.append(len(blob))
+        return string_id
+
+    words = sorted(words, key=lambda w: (w["chapter_id"].encode("utf-8"), w["domain_id"].encode("utf-8")))
+    records = array("I")
+    for word in words:
+        for field in SNAPSHOT_FIELDS:
+            value = word.get(field)
+            if field in INT_FIELDS:
+                records.append(int(value or 0))
+            elif field in JSON_FIELDS:
+                records.append(intern(json.dumps(value, ensure_ascii=False, separators=(",", ":"))))
+            else:
+                records.append(intern(value))
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, len(words), len(offsets) - 1, build_started_ns, generation))
+        f.write(offsets.tobytes())
+        f.write(records.tobytes())
+        f.write(blob)
+    os.replace(temp_path, path)
+
+async def rebuild_snapshot():
+    build_started_ns = time.time_ns()
+    # Read before the words, so a write during the build leaves the snapshot stale
+    generation = await _fetch_generation(_snapshot_path())
+    words = []
+    async for doc in collection(DOMAIN_WORDS).find({}, {"audio_binary": 0}):
+        chapter_id, domain_id = doc.get("chapter_id", ""), doc.get("domain_id", "")
+        words.append({
+            "_id": str(doc["_id"]),
+            "chapter_id": chapter_id,
+            "domain_id": domain_id,
+            "definition": doc.get("definition", ""),
+            "is_mwe": doc.get("is_mwe", False),
+            "mwe_type": doc.get("mwe_type", ""),
+            "name": doc.get("name", ""),
+            "tokens_with_pos": doc.get("tokens_with_pos", []),
+            "translations": doc.get("translations", {}),
+            "word_structure": doc.get("word_structure", {}),
+            "version": doc.get("version", 0),
+            "audio_url": f"/domain-words/audio/{chapter_id}/{domain_id}" if doc.get("audio") else None
+        })
+    path = _snapshot_path()
+    await asyncio.to_thread(write_snapshot, path, words, build_started_ns, generation)
+    print(f"✅ Domain word snapshot {os.path.basename(path)} rebuilt ({len(words)} words)")
+
+# ---------------------- FRESHNESS ---------------------- #
+async def _fetch_generation(path: str):
+    doc = await collection(COUNTERS).find_one({"_id": GENERATION_ID})
+    generation = doc.get("generation", 0) if doc else 0
+    _generations[path] = (generation, time.monotonic())
+    return generation
+
+async def _current_generation(path: str):
+    cached = _generations.get(path)
+    if cached and time.monotonic() - cached[1] < GENERATION_TTL:
+        return cached[0]
+    return await _fetch_generation(path)
+
+def _mapped_snapshot(path: str):
+    """The snapshot file at `path`, remapped if it was replaced; None if missing or unreadable"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    ident = (stat.st_ino, stat.st_mtime_ns)
+    cached = _snapshots.get(path)
+    if cached is None or cached[0] != ident:
+        try:
+            # Hot swap; the old mapping is released once no request uses it
+            cached = _snapshots[path] = (ident, WordSnapshot(path))
+        except Exception as e:
+            print(f"❌ Could not map domain word snapshot: {str(e)}")
+            return None
+    return cached[1]
+
+async def _is_fresh(path: str, snapshot: WordSnapshot):
+    if time.time_ns() - snapshot.build_started_ns > SNAPSHOT_MAX_AGE * 1e9:
+        return False
+    try:
+        return snapshot.generation == await _current_generation(path)
+    except Exception as e:
+        print(f"❌ Could not read domain word generation: {str(e)}")
+        return False
+
+async def current_snapshot():
+    """The mapped snapshot if it is enabled and up to date, else None (read from Mongo)"""
+    if not SNAPSHOT_PATH:
+        return None
+    path = _snapshot_path()
+    snapshot = _mapped_snapshot(path)
+    if snapshot is None or not await _is_fresh(path, snapshot):
+        # Missing, unreadable, written to since its build, or too old
+        _request_rebuild()
+        return None
+    return snapshot
+
+def _request_rebuild():
+    _pending_domains.add(current_domain.get())
+    _rebuild_event.set()
+
+async def notify_write():
+    """Called by every handler that changes a domain word, whether or not this host keeps a snapshot"""
+    try:
+        doc = await upsert_document(
+            collection(COUNTERS),
+            {"_id": GENERATION_ID},
+            {"$inc": {"generation": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if SNAPSHOT_PATH:
+            _generations[_snapshot_path()] = (doc["generation"], time.monotonic())
+    except Exception as e:
+        # Snapshots elsewhere catch up once they reach DOMAIN_WORD_SNAPSHOT_MAX_AGE
+        print(f"❌ Could not bump domain word generation: {str(e)}")
+    if SNAPSHOT_PATH:
+        _request_rebuild()
+
+async def _snapshot_rebuild_loop():
+    while True:
+        await _rebuild_event.wait()
+        await asyncio.sleep(SNAPSHOT_REBUILD_DELAY)
+        _rebuild_event.clear()
+        domains = list(_pending_domains)
+        _pending_domains.clear()
+        for domain in domains:
+            # Rebuild inside the domain's partition
+            token = current_domain.set(domain)
+            try:
+                path = _snapshot_path()
+                snapshot = _mapped_snapshot(path)
+                # Another worker on this host may already have rebuilt it
+                if snapshot is None or not await _is_fresh(path, snapshot):
+                    await rebuild_snapshot()
+            except Exception as e:
+                print(f"❌ Failed to rebuild domain word snapshot: {str(e)}")
+            finally:
+                current_domain.reset(token)
+
+async def start_word_snapshot():
+    global _rebuild_task
+    if not SNAPSHOT_PATH:
+        return
+    _request_rebuild()
+    _rebuild_task = asyncio.create_task(_snapshot_rebuild_loop())
+
+async def stop_word_snapshot():
+    if _rebuild_task:
+        _rebuild_task.cancel()
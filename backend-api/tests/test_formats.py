@@ -0,0 +1,166 @@
+"""Round trips of the storage formats that don't need a database:
+revision deltas and their replay, the domain word snapshot file, and Range parsing."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from api import revisions, word_snapshot
+from api.routers.word_audio import parse_range
+
+# ---------------------- REVISIONS ---------------------- #
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, field, direction):
+        self._docs = sorted(self._docs, key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self._docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+class _RevisionCollection:
+    """Just the queries api.revisions runs"""
+
+    def __init__(self):
+        self.docs = []
+
+    @staticmethod
+    def _matches(doc, query):
+        for field, condition in query.items():
+            value = doc.get(field)
+            if isinstance(condition, dict):
+                if "$lte" in condition and not value <= condition["$lte"]:
+                    return False
+                if "$gt" in condition and not value > condition["$gt"]:
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    async def insert_many(self, docs):
+        self.docs.extend(dict(doc) for doc in docs)
+
+    async def find_one(self, query, sort=None):
+        matches = _Cursor([doc for doc in self.docs if self._matches(doc, query)])
+        for field, direction in sort or []:
+            matches.sort(field, direction)
+        return matches._docs[0] if matches._docs else None
+
+    def find(self, query):
+        return _Cursor([doc for doc in self.docs if self._matches(doc, query)])
+
+@pytest.fixture
+def revision_store(monkeypatch):
+    store = _RevisionCollection()
+    monkeypatch.setattr(revisions, "collection", lambda name: store)
+    return store
+
+def _record_history(edits: int):
+    """Apply `edits` edits to a summary, recording each; returns content per version"""
+    history = [["s0", "s1", "s2"]]
+
+    async def run():
+        await revisions.record_summary_revision("full_summary", "c1", None, None, history[0])
+        for version in range(edits):
+            old = history[-1]
+            new = old[:1] + [f"edit {version}"] + old[2:] + ([f"added {version}"] if version % 3 == 0 else [])
+            revision = await revisions.record_summary_revision(
+                "full_summary", "c1", None, {"version": version, "full_summary": old}, new
+            )
+            assert revision == version + 1
+            history.append(new)
+
+    asyncio.run(run())
+    return history
+
+def test_delta_round_trip():
+    old, new = ["a", "b", "c", "d"], ["a", "x", "c", "d", "e"]
+    assert revisions._apply_delta(old, revisions._compute_delta(old, new)) == new
+    words = revisions._to_items("section_summary", "one two  three")
+    assert revisions._from_items("section_summary", words) == "one two  three"
+
+def test_replay_across_snapshot_boundary(revision_store):
+    history = _record_history(revisions.REVISION_SNAPSHOT_INTERVAL * 2 + 5)
+    snapshots = sorted(doc["revision"] for doc in revision_store.docs if doc["type"] == "snapshot")
+    assert snapshots == [0, revisions.REVISION_SNAPSHOT_INTERVAL, revisions.REVISION_SNAPSHOT_INTERVAL * 2]
+    for version, content in enumerate(history):
+        assert asyncio.run(revisions.load_summary_revision("full_summary", "c1", None, version)) == content
+    assert asyncio.run(revisions.load_summary_revision("full_summary", "c1", None, len(history))) is None
+
+def test_replay_refuses_gaps(revision_store):
+    _record_history(revisions.REVISION_SNAPSHOT_INTERVAL + 10)
+    missing = revisions.REVISION_SNAPSHOT_INTERVAL + 3
+    revision_store.docs = [doc for doc in revision_store.docs if doc["revision"] != missing]
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(revisions.load_summary_revision("full_summary", "c1", None, missing + 2))
+    assert error.value.status_code == 500
+    # Versions before the gap still rebuild
+    assert asyncio.run(revisions.load_summary_revision("full_summary", "c1", None, missing - 1)) is not None
+
+# ---------------------- DOMAIN WORD SNAPSHOT ---------------------- #
+def _word(chapter_id, domain_id, name, definition=""):
+    return {"_id": f"{chapter_id}/{domain_id}", "chapter_id": chapter_id, "domain_id": domain_id, "name": name,
+            "definition": definition, "translations": {"hi": "शब्द"}, "is_mwe": True, "version": 3}
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "words.snap")
+    words = [_word("ch2", "d1", "Cell"), _word("ch1", "d2", "Atom", "smallest unit"),
+             _word("ch1", "d1", "कोशिका"), _word("ch10", "d1", "Cell")]
+    word_snapshot.write_snapshot(path, words, build_started_ns=123, generation=7)
+    snapshot = word_snapshot.WordSnapshot(path)
+
+    assert (len(snapshot), snapshot.build_started_ns, snapshot.generation) == (4, 123, 7)
+    word = snapshot.get("ch1", "d1")
+    assert word["name"] == "कोशिका"
+    assert word["translations"] == {"hi": "शब्द"}
+    assert word["is_mwe"] is True and word["version"] == 3
+    assert word["mwe_type"] is None
+    assert snapshot.get("ch1", "d3") is None
+    assert snapshot.get("ch3", "d1") is None
+
+    # Sorted by (chapter_id, domain_id); a chapter's range doesn't include prefixed chapters
+    assert [snapshot.word(i)["domain_id"] for i in snapshot.chapter_range("ch1")] == ["d1", "d2"]
+    assert [snapshot.word(i)["chapter_id"] for i in snapshot.chapter_range("ch10")] == ["ch10"]
+    assert len(snapshot.chapter_range("ch9")) == 0
+    assert len(snapshot.chapter_range()) == 4
+
+    assert [w["chapter_id"] for w in snapshot.search("cell")] == ["ch10", "ch2"]
+    assert [w["name"] for w in snapshot.search("SMALLEST", chapter_id="ch1")] == ["Atom"]
+
+def test_snapshot_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        word_snapshot.WordSnapshot(str(path))
+
+# ---------------------- RANGE PARSING ---------------------- #
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("bytes=0-1,5-6", None),  # multi-range: whole body
+    ("items=0-5", None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=10-19", (10, 19)),
+    ("bytes=50-", (50, 99)),
+    ("bytes=90-500", (90, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-500", (0, 99)),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=20-10", "bytes=-0", "bytes=a-b", "bytes=-"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(HTTPException) as error:
+        parse_range(header, 100)
+    assert error.value.status_code == 416
+    assert error.value.headers["Content-Range"] == "bytes */100"
@@ -0,0 +1,55 @@
+"""The /all-chapters and /full-summary projections against a real server
+(MONGO_URL); skipped when none is reachable."""
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from api import db
+from api.routers.summaries import SENTENCE_COUNT, _chapter_projection, _sentence_slice
+
+@pytest.fixture(scope="module")
+def chapters():
+    client = MongoClient(db.MONGO_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"No MongoDB server at {db.MONGO_URL}")
+    chapters = client[f"{db.MONGO_DB}_projection_tests"]["chapters"]
+    chapters.drop()
+    chapters.insert_many([
+        {"chapter_id": "c1", "version": 4, "full_summary": [f"s{i}" for i in range(10)]},
+        {"chapter_id": "c2", "version": 1},  # no sentences yet
+    ])
+    yield chapters
+    chapters.drop()
+    client.close()
+
+def _find(chapters, chapter_id, projection):
+    return chapters.find_one({"chapter_id": chapter_id}, projection)
+
+@pytest.mark.parametrize("head_size, expected", [(3, ["s0", "s1", "s2"]), (50, [f"s{i}" for i in range(10)])])
+def test_head_projection(chapters, head_size, expected):
+    doc = _find(chapters, "c1", _chapter_projection("head", head_size))
+    assert doc["full_summary"] == expected
+    assert doc["total_sentences"] == 10
+
+def test_count_and_none_projections(chapters):
+    doc = _find(chapters, "c1", _chapter_projection("count", 3))
+    assert "full_summary" not in doc and doc["total_sentences"] == 10
+    assert _find(chapters, "c1", _chapter_projection("none", 3)) == {"chapter_id": "c1", "version": 4}
+
+@pytest.mark.parametrize("offset, limit, expected", [
+    (0, 2, ["s0", "s1"]),
+    (4, 3, ["s4", "s5", "s6"]),
+    (8, None, ["s8", "s9"]),
+    (12, 5, []),
+])
+def test_sentence_range_projection(chapters, offset, limit, expected):
+    doc = _find(chapters, "c1", {"version": 1, "total_sentences": SENTENCE_COUNT, "full_summary": _sentence_slice(offset, limit)})
+    assert doc["full_summary"] == expected
+    assert doc["total_sentences"] == 10
+
+def test_projections_without_sentences(chapters):
+    doc = _find(chapters, "c2", _chapter_projection("head", 3))
+    assert doc["total_sentences"] == 0 and doc.get("full_summary") is None
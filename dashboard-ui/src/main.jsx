@@ -15,6 +15,9 @@ import ReactDOM from 'react-dom/client'
 import App from './App.jsx'
 import { ToastProvider } from './context/ToastContext' // Import from context folder
 import './index.css'
+import { installSessionFetch } from './sessionFetch'
+
+installSessionFetch()
 
 ReactDOM.createRoot(document.getElementById('root')).render(
   <React.StrictMode>
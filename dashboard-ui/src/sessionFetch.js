@@ -0,0 +1,21 @@
+// Sends the logged-in user's session token with every request to the API, so
+// the backend can attribute activity to the user and route to their domain.
+const API_ORIGIN = 'http://localhost:8000'
+
+export function installSessionFetch() {
+  const originalFetch = window.fetch.bind(window)
+
+  window.fetch = (input, init = {}) => {
+    const url = input instanceof Request ? input.url : String(input)
+    const sessionToken = localStorage.getItem('session_token')
+    if (!sessionToken || !url.startsWith(API_ORIGIN)) {
+      return originalFetch(input, init)
+    }
+
+    const headers = new Headers(init.headers || (input instanceof Request ? input.headers : undefined))
+    if (!headers.has('X-Session-Token')) {
+      headers.set('X-Session-Token', sessionToken)
+    }
+    return originalFetch(input, { ...init, headers })
+  }
+}